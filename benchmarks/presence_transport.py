@@ -0,0 +1,175 @@
+"""
+Compares the two Discord presence backends: PresenceDispatcher (blocking pypresence.Presence on a
+thread) and AsyncPresenceDispatcher (pypresence.AioPresence on an event loop, --async-presence).
+
+A fake Discord IPC server is started on a unix socket, so Discord itself isn't needed. For each
+backend this measures:
+    - the latency of single updates, from schedule() until Discord's reply was read,
+    - a burst of updates scheduled back to back (how many were sent, the rest were superseded),
+    - the number of threads the process uses while sending.
+
+Run from the repository root (linux/macOS only, Discord's IPC is a named pipe on Windows):
+    python -m benchmarks.presence_transport --sends 200 --server-delay 0.002
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import Any
+
+import pypresence  # type:ignore
+
+from league_rpc.presence_dispatcher import (
+    UPDATE,
+    AsyncPresenceDispatcher,
+    PresenceDispatcher,
+)
+from league_rpc.utils.rate_limit import TokenBucket
+
+CLIENT_ID = "1185274747836174377"
+
+
+def start_fake_discord(directory: str, delay: float) -> None:
+    """Serve the Discord IPC protocol on directory/discord-ipc-0, on a thread of its own."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                op, length = struct.unpack("<II", await reader.readexactly(8))
+                request = json.loads(await reader.readexactly(length))
+                if op == 2:  # Close
+                    break
+                if op == 0:  # Handshake
+                    reply: dict[str, Any] = {"cmd": "DISPATCH", "evt": "READY", "data": {}}
+                else:
+                    await asyncio.sleep(delay)
+                    reply = {
+                        "cmd": request.get("cmd"),
+                        "evt": None,
+                        "nonce": request.get("nonce"),
+                        "data": {},
+                    }
+                data = json.dumps(reply).encode()
+                writer.write(struct.pack("<II", 1, len(data)) + data)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    async def serve() -> None:
+        await asyncio.start_unix_server(handle, os.path.join(directory, "discord-ipc-0"))
+        started.set()
+
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(serve(), loop)
+    started.wait(5)
+
+
+def activity(i: int) -> dict[str, Any]:
+    return {"details": f"Benchmark {i}", "state": "LeagueRPC", "start": 1}
+
+
+def unlimited() -> TokenBucket:
+    """The transport is what's measured here, not the rate limit."""
+    return TokenBucket(rate=1e9, burst=10**9)
+
+
+def run(dispatcher: PresenceDispatcher, sends: int) -> dict[str, float]:
+    threads = threading.active_count()
+
+    # One update at a time, timed until Discord answered it.
+    latencies = []
+    for i in range(sends):
+        sent = threading.Event()
+        started = time.perf_counter()
+        dispatcher.schedule(
+            UPDATE, lambda i=i: activity(i), on_sent=lambda _: sent.set()
+        )
+        sent.wait(5)
+        latencies.append(time.perf_counter() - started)
+
+    # A burst, every update replacing the one before it if that wasn't sent yet.
+    before = dispatcher.sent[UPDATE]
+    done = threading.Event()
+    started = time.perf_counter()
+    for i in range(sends):
+        dispatcher.schedule(
+            UPDATE,
+            lambda i=i: activity(i),
+            cancel=(UPDATE,),
+            on_sent=lambda sent_activity: sent_activity["details"]
+            == f"Benchmark {sends - 1}"
+            and done.set(),
+        )
+    done.wait(10)
+    burst_seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "burst_sent": dispatcher.sent[UPDATE] - before,
+        "burst_ms": burst_seconds * 1000,
+        "threads": threading.active_count(),
+        "threads_before": threads,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sends", type=int, default=200, help="Updates per measurement.")
+    parser.add_argument(
+        "--server-delay",
+        type=float,
+        default=0.0,
+        help="Seconds the fake Discord takes to answer an update.",
+    )
+    args = parser.parse_args()
+
+    if sys.platform == "win32":
+        sys.exit("This benchmark needs unix sockets, it doesn't run on Windows.")
+
+    directory = tempfile.mkdtemp()
+    # pypresence looks for the IPC socket in $XDG_RUNTIME_DIR.
+    os.environ["XDG_RUNTIME_DIR"] = directory
+    start_fake_discord(directory, args.server_delay)
+
+    results = {}
+
+    rpc = pypresence.Presence(CLIENT_ID)
+    rpc.connect()
+    blocking = PresenceDispatcher(limiter=unlimited())
+    blocking.attach(rpc)
+    results["Presence (thread)"] = run(blocking, args.sends)
+    blocking.close()
+
+    async_dispatcher = AsyncPresenceDispatcher(CLIENT_ID, limiter=unlimited())
+    async_dispatcher.connect()
+    results["AioPresence (event loop)"] = run(async_dispatcher, args.sends)
+    async_dispatcher.close()
+
+    print(
+        f"{'backend':<26}{'p50':>9}{'p95':>9}{'max':>9}"
+        f"{'burst sent':>12}{'burst':>10}{'threads':>9}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<26}{result['p50_ms']:>7.2f}ms{result['p95_ms']:>7.2f}ms"
+            f"{result['max_ms']:>7.2f}ms{result['burst_sent']:>7.0f}/{args.sends:<4}"
+            f"{result['burst_ms']:>8.1f}ms{result['threads']:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,20 @@ import random
 import sys
 import threading
 import time
+from typing import Any
 
 import nest_asyncio  # type:ignore
-import pypresence  # type:ignore
 
+from league_rpc.latest_version import version_resolver
 from league_rpc.lcu_api.lcu_connector import module_data, start_connector
 from league_rpc.logger.richlogger import RichLogger
+from league_rpc.metrics import DEFAULT_WRITE_INTERVAL_SECONDS, MetricsWriter
+from league_rpc.presence_dispatcher import (
+    DEFAULT_SEND_BURST,
+    DEFAULT_SEND_RATE,
+    PLACEHOLDER,
+    AsyncPresenceDispatcher,
+)
 from league_rpc.processes.process import (
     check_discord_process,
     check_league_client_process,
@@ -18,12 +26,14 @@ from league_rpc.utils.const import (
     ANIMATED_SKIN_URL,
     ANIMATED_SKINS,
     DEFAULT_CLIENT_ID,
+    DEFAULT_VERSION_TTL_SECONDS,
     DISCORD_PROCESS_NAMES,
     LEAGUE_CLASSIC_ICON,
     PLACEHOLDER_ICON_ROTATE_INTERVAL_SECONDS,
     SMALL_TEXT,
 )
 from league_rpc.utils.launch_league import find_default_path
+from league_rpc.utils.rate_limit import TokenBucket
 
 
 def _random_animated_skin() -> str:
@@ -36,6 +46,12 @@ def main(cli_args: argparse.Namespace) -> None:
     """
 
     logger = RichLogger(show_debugs=cli_args.debug)
+    version_resolver.ttl_seconds = cli_args.version_ttl
+
+    metrics_writer = None
+    if cli_args.metrics_file:
+        metrics_writer = MetricsWriter(cli_args.metrics_file, cli_args.metrics_interval)
+        metrics_writer.start()
 
     ############################################################
     ## Check Discord, RiotClient & LeagueClient processes     ##
@@ -53,37 +69,41 @@ def main(cli_args: argparse.Namespace) -> None:
 
     placeholder_start = int(time.time())
 
-    def send_placeholder() -> None:
-        with module_data.rpc_lock:
-            try:
-                rpc.update(
-                    large_image=_random_animated_skin(),
-                    large_text="LeagueRPC",
-                    small_image=LEAGUE_CLASSIC_ICON,
-                    small_text=SMALL_TEXT,
-                    details="Launching League...",
-                    state="LeagueRPC",
-                    start=placeholder_start,
-                )
-            except pypresence.exceptions.PyPresenceException:
-                pass
-
-    def rotate_placeholder_icon(stop_event: threading.Event) -> None:
-        while not stop_event.wait(PLACEHOLDER_ICON_ROTATE_INTERVAL_SECONDS):
-            send_placeholder()
-
-    send_placeholder()
+    def placeholder() -> dict[str, Any]:
+        return {
+            "large_image": _random_animated_skin(),
+            "large_text": "LeagueRPC",
+            "small_image": LEAGUE_CLASSIC_ICON,
+            "small_text": SMALL_TEXT,
+            "details": "Launching League...",
+            "state": "LeagueRPC",
+            "start": placeholder_start,
+        }
 
-    stop_rotation = threading.Event()
-    threading.Thread(
-        target=rotate_placeholder_icon, args=(stop_rotation,), daemon=True
-    ).start()
+    # From here on, every call to Discord goes through the presence dispatcher.
+    limiter = TokenBucket(rate=cli_args.presence_rate, burst=cli_args.presence_burst)
+    if cli_args.async_presence:
+        # The blocking connection only served to check that Discord accepts us.
+        rpc.close()
+        module_data.presence = AsyncPresenceDispatcher(
+            cli_args.client_id, limiter=limiter
+        )
+        module_data.presence.connect(logger)
+        rpc = module_data.presence.rpc
+    else:
+        module_data.presence.limiter = limiter
+        module_data.presence.attach(rpc, logger)
+    module_data.presence.schedule(
+        PLACEHOLDER,
+        placeholder,
+        repeat=PLACEHOLDER_ICON_ROTATE_INTERVAL_SECONDS,
+    )
 
     logger.start_progress_bar(name="Checking League")
     check_league_client_process(cli_args, logger)
     logger.stop_progress_bar()
 
-    stop_rotation.set()
+    module_data.presence.cancel(PLACEHOLDER)
 
     # Start LCU_Thread
     # This process will connect to the LCU API and updates the rpc based on data subscribed from the LCU API.
@@ -107,22 +127,11 @@ def main(cli_args: argparse.Namespace) -> None:
         logger.info(f"{e.__class__.__name__} detected. Shutting down the program..")
     finally:
         # Always close the RPC connection when exiting (whether by KeyboardInterrupt or League closing).
-        # Discord may have already closed the IPC pipe on its end (e.g. Discord was
-        # closed, or the pipe timed out) by the time we get here, which pypresence
-        # surfaces as PyPresenceException (PipeClosed, ResponseTimeout, ...), or as a
-        # RuntimeError if the heartbeat/reclaim threads were mid-call on the same
-        # connection. This is best-effort cleanup on the way out, so nothing here
-        # should crash the app - hence the broad except.
-        with module_data.rpc_lock:
-            try:
-                rpc.clear()
-            except Exception:
-                pass
-            try:
-                rpc.close()
-            except Exception:
-                pass
+        # The dispatcher drops every pending send first, and doesn't let errors through.
+        module_data.presence.close()
         logger.info("Discord RPC connection closed.")
+        if metrics_writer is not None:
+            metrics_writer.stop()
 
     ############################################################
 
@@ -184,6 +193,41 @@ if __name__ == "__main__":
         default=default_league_path,
         help=f"Path to the League of Legends client executable. Default path is: {default_league_path}",
     )
+    parser.add_argument(
+        "--async-presence",
+        action="store_true",
+        help="use '--async-presence' to talk to Discord over pypresence's asyncio client (AioPresence), instead of the blocking one.",
+    )
+    parser.add_argument(
+        "--presence-rate",
+        type=float,
+        default=DEFAULT_SEND_RATE,
+        help=f"Average number of presence updates per second sent to Discord. Default is {DEFAULT_SEND_RATE}",
+    )
+    parser.add_argument(
+        "--presence-burst",
+        type=int,
+        default=DEFAULT_SEND_BURST,
+        help=f"Number of presence updates that may be sent to Discord back to back. Default is {DEFAULT_SEND_BURST}",
+    )
+    parser.add_argument(
+        "--version-ttl",
+        type=float,
+        default=DEFAULT_VERSION_TTL_SECONDS,
+        help=f"Seconds the latest DDragon version is cached before it's refreshed in the background. Default is {DEFAULT_VERSION_TTL_SECONDS}",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=None,
+        help="Path of a file to write metrics to (request latencies, cache hits, Discord sends...). Written as JSON if it ends with .json, in the Prometheus text format otherwise.",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=DEFAULT_WRITE_INTERVAL_SECONDS,
+        help=f"Seconds between two writes of --metrics-file. Default is {DEFAULT_WRITE_INTERVAL_SECONDS}",
+    )
     parser.add_argument(
         "--hide-in-client",
         action="store_true",
@@ -191,6 +235,12 @@ if __name__ == "__main__":
     )
 
     args: argparse.Namespace = parser.parse_args()
+    if args.presence_rate <= 0 or args.presence_burst < 1:
+        parser.error("--presence-rate must be positive and --presence-burst at least 1")
+    if args.metrics_interval <= 0:
+        parser.error("--metrics-interval must be positive")
+    if args.version_ttl < 0:
+        parser.error("--version-ttl can't be negative")
 
     # Prints the League RPC logo
     print(Color().logo)
@@ -224,6 +274,25 @@ if __name__ == "__main__":
         print(
             f"{Color.green}Argument {Color.blue}--hide-emojis{Color.green} detected.. Will hide emojis. such as league status indicators on Discord.{Color.reset}"
         )
+    if args.async_presence:
+        print(
+            f"{Color.green}Argument {Color.blue}--async-presence{Color.green} detected.. Will use the asyncio Discord client.{Color.reset}"
+        )
+    if (
+        args.presence_rate != DEFAULT_SEND_RATE
+        or args.presence_burst != DEFAULT_SEND_BURST
+    ):
+        print(
+            f"{Color.green}Argument {Color.blue}--presence-rate/--presence-burst{Color.green} detected.. Will send at most {Color.blue}{args.presence_burst}{Color.green} updates at once, {Color.blue}{args.presence_rate:g}{Color.green} per second on average.{Color.reset}"
+        )
+    if args.version_ttl != DEFAULT_VERSION_TTL_SECONDS:
+        print(
+            f"{Color.green}Argument {Color.blue}--version-ttl{Color.green} detected.. Will refresh the DDragon version every {Color.blue}{args.version_ttl:g}{Color.green} seconds.{Color.reset}"
+        )
+    if args.metrics_file:
+        print(
+            f"{Color.green}Argument {Color.blue}--metrics-file{Color.green} detected.. Will write metrics to {Color.blue}{args.metrics_file}{Color.green} every {Color.blue}{args.metrics_interval:g}{Color.green} seconds.{Color.reset}"
+        )
     if args.debug:
         print(
             f"{Color.green}Argument {Color.blue}--debug{Color.green} detected.. Will show debug logs.{Color.reset}"
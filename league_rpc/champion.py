@@ -4,27 +4,39 @@ from typing import Any, Optional
 import requests
 import urllib3
 
-from league_rpc.disable_native_rpc.disable import find_game_locale
-from league_rpc.kda import get_gold, get_level
+from league_rpc import metrics
+from league_rpc.chroma_store import chroma_store
 from league_rpc.latest_version import get_latest_version
-from league_rpc.username import get_riot_id
+from league_rpc.models.live_game_snapshot import LiveGameSnapshot
+from league_rpc.models.match_memo import MatchMemo
+from league_rpc.processes.locale_provider import locale_provider
+from league_rpc.skin_index import get_skin_index
+from league_rpc.skin_tiles import skin_tile_cache
 from league_rpc.utils.color import Color
 from league_rpc.utils.const import (
-    ALL_GAME_DATA_URL,
     ANIMATED_SKIN_URL,
     ANIMATED_SKINS,
     BASE_SKIN_URL,
     CHAMPION_NAME_CONVERT_MAP,
     DDRAGON_CHAMPION_DATA,
-    GAME_MODE_CONVERT_MAP,
-    MERAKIANALYTICS_CHAMPION_DATA,
 )
-from league_rpc.utils.polling import wait_until_exists
+from league_rpc.utils.disk_cache import DiskCache
 
 urllib3.disable_warnings()
 
 
-def get_specific_champion_data(name: str, locale: str) -> Optional[dict[str, Any]]:
+# DDragon champion files never change within a patch, so each one is downloaded once per
+# version and locale, and read from disk (or memory) on every later tick.
+champion_data_cache = DiskCache(namespace="ddragon-champion")
+
+# Names DDragon has no champion file for in this version (e.g. the "Name" or "KDA" parts of
+# rawChampionName), so the fallbacks in gather_league_data don't hit the network every tick.
+_missing_champion_files: set[str] = set()
+
+
+def get_specific_champion_data(
+    name: str, locale: str, version: Optional[str] = None
+) -> Optional[dict[str, Any]]:
     """
     Get the specific champion data for the champion name.
     Returns None if the data cannot be fetched (invalid champion name, API error, etc.)
@@ -33,7 +45,14 @@ def get_specific_champion_data(name: str, locale: str) -> Optional[dict[str, Any
     if not name or name in ("Name", "Unknown", ""):
         return None
 
-    version: str = get_latest_version()
+    if version is None:
+        version = get_latest_version()
+
+    cache_key = f"{version}/{locale}/{name}"
+    if cache_key in _missing_champion_files:
+        return None
+    if (cached := champion_data_cache.get(cache_key)) is not None:
+        return cached
 
     url = DDRAGON_CHAMPION_DATA.format_map(
         {
@@ -44,120 +63,94 @@ def get_specific_champion_data(name: str, locale: str) -> Optional[dict[str, Any
     )
 
     try:
-        response: requests.Response = requests.get(
-            url=url,
-            timeout=15,
-        )
+        with metrics.http_request_seconds.time(source="ddragon_champion"):
+            response: requests.Response = requests.get(
+                url=url,
+                timeout=15,
+            )
+        if response.status_code in (HTTPStatus.FORBIDDEN, HTTPStatus.NOT_FOUND):
+            # DDragon answers 403 for files that don't exist.
+            _missing_champion_files.add(cache_key)
+            return None
         response.raise_for_status()
-        return response.json()
+        data = response.json()
     except (requests.RequestException, ValueError):
         # Champion data fetch failed - may be invalid name or network error
         return None
 
+    champion_data_cache.set(cache_key, data)
+    return data
+
 
 def get_specific_chroma_data(name: str, locale: str) -> Optional[dict[str, Any]]:
     """
-    Get the specific chroma champion data for the champion name.
+    Get the specific chroma champion data for the champion name, from the local chroma store.
     Returns None if the data cannot be fetched (API down, network error, etc.)
     """
-    url = MERAKIANALYTICS_CHAMPION_DATA.format_map(
-        {
-            "locale": locale.replace("_", "-"),
-        }
-    )
-    try:
-        response: requests.Response = requests.get(
-            url=url,
-            timeout=15,
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data[name]
-    except (requests.RequestException, ValueError, KeyError):
-        # If chroma data fetch fails, return None - chroma detection will be skipped
-        return None
-
-
-def gather_game_mode(startup: bool = True) -> str:
-    """
-    Get the current game mode.
-
-    Args:
-        startup: If True, retry on connection errors (use for first call when game starts).
-                 If False, fail fast on connection errors (use for subsequent polling calls).
-    """
-    if response := wait_until_exists(
-        url=ALL_GAME_DATA_URL,
-        custom_message="Did not find game data.. Will try again in 5 seconds",
-        startup=startup,
-    ):
-        parsed_data = response.json()
-        raw_mode: str = parsed_data["gameData"]["gameMode"]
-        return GAME_MODE_CONVERT_MAP.get(raw_mode, raw_mode)
-    return ""
+    # If chroma data can't be found, return None - chroma detection will be skipped
+    return chroma_store.get(name=name, locale=locale.replace("_", "-"))
 
 
 def gather_ingame_information(
+    snapshot: LiveGameSnapshot,
     silent: bool = False,
+    memo: Optional[MatchMemo] = None,
 ) -> tuple[str, str, str, int, str, int, int]:
     """
     Get the current playing champion name.
-    """
-    your_summoner_name: str = get_riot_id()
 
+    If a memo of the current match is given, the champion, skin and chroma are only resolved
+    on the first call, every later call reads them from the memo.
+    """
     champion_name: str | None = None
     skin_id: int | None = None
     skin_name: str | None = None
     chroma_name: str | None = None
-    game_mode: str | None = (
-        None  # Set if the game mode was never found.. Maybe you are playing something new?
-    )
     level: int | None = None
     gold: int | None = None
 
-    # Use startup=not silent: retry on first call, fail fast on subsequent polling calls
-    if response := wait_until_exists(
-        url=ALL_GAME_DATA_URL,
-        custom_message="Did not find game data.. Will try again in 5 seconds",
-        startup=not silent,
-    ):
-        parsed_data = response.json()
-        game_mode = GAME_MODE_CONVERT_MAP.get(
-            parsed_data["gameData"]["gameMode"],
-            parsed_data["gameData"]["gameMode"],
-        )
+    # Empty if the game mode was never found.. Maybe you are playing something new?
+    game_mode: str = snapshot.game_mode
 
-        if game_mode == "TFT":
-            # If the currentGame is TFT.. gather the relevant information
-            level = get_level()
-        else:
-            # If the gamemode is LEAGUE gather the relevant information.
+    if game_mode == "TFT":
+        # If the currentGame is TFT.. gather the relevant information
+        level = snapshot.level
+    else:
+        # If the gamemode is LEAGUE gather the relevant information.
 
+        if memo is not None and memo.league_data is not None:
+            champion_name, skin_id, skin_name, chroma_name = memo.league_data
+        else:
+            if memo is not None and memo.locale is None:
+                memo.locale = locale_provider.get()
             champion_name, skin_id, skin_name, chroma_name = gather_league_data(
-                parsed_data=parsed_data, summoners_name=your_summoner_name
+                parsed_data=snapshot.all_game_data,
+                summoners_name=snapshot.riot_id,
+                locale=memo.locale if memo is not None else None,
             )
-            if game_mode in ("Arena", "Swarm"):
-                level, gold = get_level(), get_gold()
-
-            if not silent:
-                print("-" * 50)
-                if champion_name:
-                    print(
-                        f"{Color.yellow}Champion: {Color.green}{CHAMPION_NAME_CONVERT_MAP.get(champion_name, champion_name)}{Color.reset}"
-                    )
-                if skin_name:
-                    print(
-                        f"{Color.yellow}Skin: {Color.green}{skin_name}{Color.reset}"
-                    )
-                if chroma_name:
-                    print(
-                        f"{Color.yellow}Chroma: {Color.green}{chroma_name}{Color.reset}"
-                    )
-                if game_mode:
-                    print(
-                        f"{Color.yellow}Game mode: {Color.green}{game_mode}{Color.reset}"
-                    )
-                print("-" * 50)
+            # Don't remember a failed lookup (e.g. loading screen), try again next tick.
+            if memo is not None and champion_name:
+                memo.league_data = (champion_name, skin_id, skin_name, chroma_name)
+        if game_mode in ("Arena", "Swarm"):
+            level, gold = snapshot.level, snapshot.gold
+
+        if not silent:
+            print("-" * 50)
+            if champion_name:
+                print(
+                    f"{Color.yellow}Champion: {Color.green}{CHAMPION_NAME_CONVERT_MAP.get(champion_name, champion_name)}{Color.reset}"
+                )
+            if skin_name:
+                print(f"{Color.yellow}Skin: {Color.green}{skin_name}{Color.reset}")
+            if chroma_name:
+                print(
+                    f"{Color.yellow}Chroma: {Color.green}{chroma_name}{Color.reset}"
+                )
+            if game_mode:
+                print(
+                    f"{Color.yellow}Game mode: {Color.green}{game_mode}{Color.reset}"
+                )
+            print("-" * 50)
 
     # Returns default values if information was not found.
     return (
@@ -209,19 +202,22 @@ def get_champion_name_from_raw_skin_name(raw_skin_name: str) -> str:
 def gather_league_data(
     parsed_data: dict[str, Any],
     summoners_name: str,
+    locale: Optional[str] = None,
 ) -> tuple[Optional[str], int, Optional[str], Optional[str]]:
     """
     If the gamemode is LEAGUE, gather the relevant information and return it to RPC.
     Returns (None, 0, None, None) if champion data is not yet available (e.g., loading screen).
+    The game locale is looked up from the League process, unless it is given.
     """
     champion_name: Optional[str] = None
     skin_id: int = 0
     base_skin_id: int = 0
     skin_name: Optional[str] = None
     chroma_name: Optional[str] = None
-    locale = find_game_locale(
-        league_processes=["LeagueClient.exe", "LeagueClientUx.exe"]
-    )
+    if locale is None:
+        locale = locale_provider.get()
+    # Resolved once, and shared by the champion name fallbacks below.
+    version: str = get_latest_version()
 
     current_summoner_data = fetch_current_player_data(
         all_game_data=parsed_data["allPlayers"],
@@ -235,6 +231,7 @@ def gather_league_data(
     ddragon_champion_data = get_specific_champion_data(
         name=raw_champion_name,
         locale=locale,
+        version=version,
     )
 
     # Riot's in-game API has inconsistent field formats depending on skin state:
@@ -258,6 +255,7 @@ def gather_league_data(
         ddragon_champion_data = get_specific_champion_data(
             name=raw_champion_name,
             locale=locale,
+            version=version,
         )
 
     if ddragon_champion_data is None:
@@ -268,6 +266,7 @@ def gather_league_data(
         ddragon_champion_data = get_specific_champion_data(
             name=raw_champion_name,
             locale=locale,
+            version=version,
         )
 
     # If champion data is still not available (loading screen, invalid name), return defaults
@@ -309,48 +308,15 @@ def find_base_skin_and_chroma(
     """
     Find the base skin ID and chroma name for a given skin_id.
 
-    This function searches both DDragon and Meraki data to correctly identify
-    whether skin_id is a base skin or a chroma, and returns the appropriate data.
+    Both DDragon and Meraki data are used to correctly identify whether skin_id is a base
+    skin or a chroma (see skin_index.SkinIndex), and the appropriate data is returned.
 
     Returns:
         tuple[int, Optional[str]]: (base_skin_id, chroma_name or None)
     """
-    ddragon_skins = ddragon_champion_data["data"][raw_champion_name]["skins"]
-
-    # Check Meraki FIRST — DDragon now includes chromas as skin entries with their
-    # own sequential num values (e.g. DrMundo num=17 is "Corporate Mundo (Rose Quartz)").
-    # Checking DDragon first would mistake a chroma num for a base skin and return early,
-    # skipping Meraki entirely. Meraki explicitly separates base skins from their chromas.
-    if chroma_data is not None:
-        for meraki_skin in chroma_data.get("skins") or []:
-            for chroma in meraki_skin.get("chromas") or []:
-                if chroma is None:
-                    continue
-                # Meraki chroma IDs match the game's skinID value
-                if chroma["id"] % 1000 == skin_id:
-                    meraki_skin_id = meraki_skin["id"]
-                    # Meraki IDs are like 36003; last 3 digits are the base skin num
-                    base_skin_num = meraki_skin_id % 1000
-                    return base_skin_num, chroma["name"]
-
-    # Not found in Meraki chromas — check DDragon for a true base skin.
-    # Skip entries that look like chromas: DDragon names them "Skin Name (Color)",
-    # while base skins never have a parenthetical suffix.
-    for skin in ddragon_skins:
-        if skin["num"] == skin_id:
-            skin_name = skin.get("name", "")
-            if skin_name == "default" or "(" not in skin_name:
-                return skin_id, None
-
-    # Fallback heuristic: find the highest base-skin num <= skin_id.
-    # Skip chroma entries so we don't land on the wrong base skin.
-    for skin in sorted(ddragon_skins, key=lambda x: x["num"], reverse=True):
-        if skin["num"] <= skin_id:
-            skin_name = skin.get("name", "")
-            if skin_name == "default" or "(" not in skin_name:
-                return skin["num"], None
-
-    return 0, None
+    return get_skin_index(
+        raw_champion_name, ddragon_champion_data, chroma_data
+    ).base_skin_and_chroma(skin_id)
 
 
 def skin_is_chroma(skin_id: int, base_skin_id: int) -> bool:
@@ -365,67 +331,68 @@ def get_base_skin_id_from_skin_id(
     Determine the base skin ID from the API's skinID.
 
     If skinID matches a skin's 'num' in DDragon, it's a base skin.
-    If not, it's likely a chroma - use heuristic to find the parent skin.
+    If not, it's likely a chroma - the highest num <= skinID is its parent skin,
+    since chroma IDs are typically assigned after their base skin.
     """
-    skins = ddragon_champion_data["data"][raw_champion_name]["skins"]
-
-    # Check if skinID is a base skin
-    for skin in skins:
-        if skin["num"] == skin_id:
-            return skin_id
-
-    # Likely a chroma - find the base skin by finding highest num <= skinID
-    # This heuristic works because chroma IDs are typically assigned after their base skin
-    for skin in sorted(skins, key=lambda x: x["num"], reverse=True):
-        if skin["num"] <= skin_id:
-            return skin["num"]
-
-    return 0  # Fallback to default skin
+    return get_skin_index(raw_champion_name, ddragon_champion_data).base_skin_id(
+        skin_id
+    )
 
 
 def get_skin_name_from_id(
     skin_id: int, raw_champion_name: str, ddragon_champion_data: dict[str, Any]
 ) -> Optional[str]:
     """Get the skin name from DDragon. Returns None for default skin or if not found."""
-    skins = ddragon_champion_data["data"][raw_champion_name]["skins"]
-
-    for skin in skins:
-        if skin["num"] == skin_id:
-            return None if skin["name"] == "default" else skin["name"]
-
-    return None
+    return get_skin_index(raw_champion_name, ddragon_champion_data).display_name(
+        skin_id
+    )
 
 
 def get_skin_asset(
     champion_name: str,
     skin_id: int,
+    memo: Optional[MatchMemo] = None,
 ) -> str:
     """
     Returns the URL for the skin/default skin of the champion.
     If a chroma has been selected, it will return the base skin for that chroma.
         Since RIOT does not have individual images for each chroma.
     """
+    if memo is not None and (champion_name, skin_id) in memo.skin_assets:
+        return memo.skin_assets[(champion_name, skin_id)]
 
+    if (url := skin_tile_cache.get_url(champion_name, skin_id)) is None:
+        url = _resolve_skin_asset(champion_name, skin_id)
+        if url is None:
+            # DDragon couldn't tell, show the default skin for now and ask again next time.
+            return f"{BASE_SKIN_URL}{champion_name}_0.jpg"
+
+    if memo is not None:
+        memo.skin_assets[(champion_name, skin_id)] = url
+    return url
+
+
+def _resolve_skin_asset(champion_name: str, skin_id: int) -> Optional[str]:
+    """Count the skin number down until DDragon has a tile for it.
+    None if a tile check was inconclusive, then nothing is remembered.
+    """
+    requested_skin_id = skin_id
+    url = f"{BASE_SKIN_URL}{champion_name}_0.jpg"
     while skin_id:
-        url: str = f"{BASE_SKIN_URL}{champion_name}_{skin_id}.jpg"
-        if not check_url(url=url):
+        exists = skin_tile_cache.tile_exists(champion_name, skin_id)
+        if exists is None:
+            return None
+        if not exists:
             skin_id -= 1
             continue
 
+        url = f"{BASE_SKIN_URL}{champion_name}_{skin_id}.jpg"
         # If the Champ_skinID matches a animated skin, then return the URL for the animated skin instead.
         if f"{champion_name}_{skin_id}" in ANIMATED_SKINS:
             url = ANIMATED_SKIN_URL.format_map(
                 {"filename": f"{champion_name}_{skin_id}"}
             )
-        return url
-    url = f"{BASE_SKIN_URL}{champion_name}_0.jpg"
-    return url
-
+        break
 
-def check_url(url: str) -> bool:
-    """
-    Sends a HEAD request to the URL and,
-    returns a boolean value depending on if the request,
-    was successful (200 OK) or not.
-    """
-    return requests.head(url=url, timeout=15).status_code == HTTPStatus.OK
+    skin_tile_cache.set_url(champion_name, requested_skin_id, url)
+    return url
@@ -0,0 +1,89 @@
+"""
+Local, per-champion index of the Meraki Analytics skin and chroma data.
+
+Meraki only publishes one champions.json containing every champion (several MB). Once per patch
+and locale it is downloaded, reduced to the fields chroma detection needs (skin ids, chroma ids
+and names) and split into one DiskCache entry per champion. After that, looking up a champion
+is a single hashed file read, or a dict hit for recently used champions, without any network
+traffic.
+"""
+
+import threading
+from typing import Any, Optional
+
+import requests
+
+from league_rpc import metrics
+from league_rpc.latest_version import get_latest_version
+from league_rpc.utils.const import MERAKIANALYTICS_CHAMPION_DATA
+from league_rpc.utils.disk_cache import DiskCache
+
+
+def _compact_champion(champion: dict[str, Any]) -> dict[str, Any]:
+    """Keep only the parts of a Meraki champion entry that chroma detection reads."""
+    return {
+        "skins": [
+            {
+                "id": skin["id"],
+                "name": skin.get("name", ""),
+                "chromas": [
+                    {"id": chroma["id"], "name": chroma.get("name", "")}
+                    for chroma in skin.get("chromas") or []
+                    if chroma is not None
+                ],
+            }
+            for skin in champion.get("skins") or []
+            if skin is not None
+        ]
+    }
+
+
+class ChromaStore:
+    """Looks up a champion's skins and chromas from the local index, importing it first if needed."""
+
+    def __init__(self) -> None:
+        self._cache = DiskCache(namespace="meraki-chromas", max_bytes=16 * 1024 * 1024)
+        self._import_lock = threading.Lock()
+
+    def get(self, name: str, locale: str) -> Optional[dict[str, Any]]:
+        """
+        Return {"skins": [{"id", "name", "chromas": [{"id", "name"}]}]} for the champion,
+        or None if it is unknown or the dataset can't be downloaded.
+        """
+        try:
+            version = get_latest_version()
+        except RuntimeError:
+            return None
+
+        prefix = f"{version}/{locale}"
+        if (champion := self._cache.get(f"{prefix}/{name}")) is not None:
+            return champion
+
+        with self._import_lock:
+            champions: Optional[list[str]] = self._cache.get(f"{prefix}/__index__")
+            if champions is None or name in champions:
+                # Never imported for this patch, or the entry was evicted since.
+                if not self._import(prefix, locale):
+                    return None
+
+        return self._cache.get(f"{prefix}/{name}")
+
+    def _import(self, prefix: str, locale: str) -> bool:
+        """Download champions.json and split it into one entry per champion."""
+        url = MERAKIANALYTICS_CHAMPION_DATA.format_map({"locale": locale})
+        try:
+            with metrics.http_request_seconds.time(source="meraki_champions"):
+                response = requests.get(url=url, timeout=15)
+            response.raise_for_status()
+            data: dict[str, Any] = response.json()
+        except (requests.RequestException, ValueError):
+            return False
+
+        for name, champion in data.items():
+            self._cache.set(f"{prefix}/{name}", _compact_champion(champion))
+        # Written last, so an interrupted import is retried on the next lookup.
+        self._cache.set(f"{prefix}/__index__", sorted(data))
+        return True
+
+
+chroma_store = ChromaStore()
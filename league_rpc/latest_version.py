@@ -1,14 +1,140 @@
+import threading
+import time
+from typing import Optional
+
 import requests
 
-from league_rpc.utils.const import DDRAGON_API_VERSIONS
+from league_rpc import metrics
+from league_rpc.utils.const import DDRAGON_API_VERSIONS, DEFAULT_VERSION_TTL_SECONDS
+from league_rpc.utils.disk_cache import DiskCache
 
+_version_age = metrics.gauge(
+    "league_rpc_ddragon_version_age_seconds",
+    "Seconds since the cached DDragon version was fetched.",
+)
+_refresh_seconds = metrics.gauge(
+    "league_rpc_ddragon_version_refresh_seconds",
+    "Duration of the last refresh of the DDragon version.",
+)
+_refreshes = metrics.counter(
+    "league_rpc_ddragon_version_refreshes_total",
+    "Refreshes of the DDragon version, by result.",
+    ["result"],
+)
 
-def get_latest_version() -> str:
+
+def fetch_latest_version() -> str:
     try:
-        response = requests.get(url=DDRAGON_API_VERSIONS, timeout=15)
+        with metrics.http_request_seconds.time(source="ddragon_versions"):
+            response = requests.get(url=DDRAGON_API_VERSIONS, timeout=15)
         response.raise_for_status()
         data = response.json()
         latest_version = data[0]
         return latest_version
     except (requests.RequestException, ValueError, IndexError, KeyError) as e:
         raise RuntimeError(f"Failed to fetch latest version from DDragon API: {e}") from e
+
+
+class VersionResolver:
+    """
+    Memoizes the latest DDragon version, in memory and on disk, for ttl_seconds.
+
+    Only the very first lookup (nothing in memory, nothing on disk) waits for DDragon. Once the
+    value is older than the TTL, callers keep getting it while a background thread refreshes it.
+    If that refresh fails (e.g. offline), the last known version stays in use.
+    """
+
+    CACHE_KEY = "latest"
+
+    def __init__(self, ttl_seconds: float = DEFAULT_VERSION_TTL_SECONDS) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.refresh_count = 0
+        self.refresh_failures = 0
+        self.last_refresh_latency: Optional[float] = None
+
+        self._version: Optional[str] = None
+        self._fetched_at: float = 0.0  # Wall clock, so it survives restarts through the disk cache.
+        self._disk_cache = DiskCache(namespace="ddragon-version", max_bytes=64 * 1024)
+        self._lock = threading.Lock()
+        self._refreshing = False
+        _version_age.set_function(lambda: self.cache_age)
+
+    @property
+    def cache_age(self) -> Optional[float]:
+        """Seconds since the cached version was fetched, None if there is none."""
+        if self._version is None:
+            return None
+        return max(time.time() - self._fetched_at, 0.0)
+
+    def get(self) -> str:
+        """Return the latest known version, raises RuntimeError if there is none and DDragon can't be reached."""
+        with self._lock:
+            if self._version is None:
+                self._load_from_disk()
+            version = self._version
+            stale = self.cache_age is None or self.cache_age > self.ttl_seconds
+            if version is not None and stale and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+        if version is not None:
+            return version
+
+        # Cold start: nothing to fall back on, so this one has to wait.
+        return self.refresh()
+
+    def refresh(self) -> str:
+        """Fetch the version from DDragon now and cache it."""
+        started = time.perf_counter()
+        try:
+            version = fetch_latest_version()
+        except RuntimeError:
+            with self._lock:
+                self.refresh_failures += 1
+            _refreshes.inc(result="error")
+            raise
+        finally:
+            self.last_refresh_latency = time.perf_counter() - started
+            _refresh_seconds.set(self.last_refresh_latency)
+
+        with self._lock:
+            self.refresh_count += 1
+            self._version = version
+            self._fetched_at = time.time()
+        _refreshes.inc(result="ok")
+        self._disk_cache.set(
+            self.CACHE_KEY, {"version": version, "fetched_at": self._fetched_at}
+        )
+        return version
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except RuntimeError:
+            # Offline or DDragon is down, keep using the last known version.
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _load_from_disk(self) -> None:
+        entry = self._disk_cache.get(self.CACHE_KEY)
+        if isinstance(entry, dict) and entry.get("version"):
+            self._version = entry["version"]
+            self._fetched_at = float(entry.get("fetched_at", 0))
+
+    def __str__(self) -> str:
+        age = "n/a" if self.cache_age is None else f"{self.cache_age:.0f}s"
+        latency = (
+            "n/a"
+            if self.last_refresh_latency is None
+            else f"{self.last_refresh_latency * 1000:.0f}ms"
+        )
+        return f"version={self._version} age={age} refresh_latency={latency}"
+
+
+version_resolver = VersionResolver()
+
+
+def get_latest_version() -> str:
+    return version_resolver.get()
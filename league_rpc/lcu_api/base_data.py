@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Awaitable
 
 if TYPE_CHECKING:
     from league_rpc.models.module_data import ModuleData
@@ -16,6 +18,7 @@ from league_rpc.models.lcu.gameflow_phase import (
     LolGameflowLobbyStatus,
     LolGameflowPlayerStatus,
 )
+from league_rpc.processes.locale_provider import locale_provider
 from league_rpc.utils.const import (
     ARAM_CUSTOM_GAME_QUEUE_IDS,
     CUSTOM_GAME_QUEUE_IDS,
@@ -24,28 +27,78 @@ from league_rpc.utils.const import (
 )
 
 
-# Base Data
-# Gather base data from the LCU API on startup
-async def gather_base_data(connection: Connection, module_data: "ModuleData") -> None:
-    data: ClientData = module_data.client_data
+# Every base data request gets this long before it's given up on.
+BASE_DATA_REQUEST_TIMEOUT_SECONDS = 10
 
-    # Epoch time from which league client was started.
-    await gather_telemetry_data(connection=connection, data=data)
 
-    await gather_summoner_data(connection=connection, data=data)
+async def _timed_request(
+    name: str, request: Awaitable[None], timings: dict[str, float]
+) -> None:
+    """Await a single base data request with a timeout, and record how long it took."""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(request, timeout=BASE_DATA_REQUEST_TIMEOUT_SECONDS)
+    finally:
+        timings[name] = time.perf_counter() - started
 
-    # get Online/Away status
-    await gather_chat_status_data(connection=connection, data=data)
 
-    # Get tft companion data
-    await gather_tft_companion_data(connection=connection, data=data)
+# Base Data
+# Gather base data from the LCU API on startup
+async def gather_base_data(connection: Connection, module_data: "ModuleData") -> None:
+    data: ClientData = module_data.client_data
+    logger = module_data.logger
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+
+    # None of these depend on each other, so they are all requested at once.
+    pending: dict[str, Awaitable[None]] = {
+        # Epoch time from which league client was started.
+        "telemetry": gather_telemetry_data(connection=connection, data=data),
+        # Locale of the client, so the process list doesn't have to be searched for it.
+        "locale": gather_locale_data(connection=connection),
+        "summoner": gather_summoner_data(connection=connection, data=data),
+        # get Online/Away status
+        "chat": gather_chat_status_data(connection=connection, data=data),
+        # Get tft companion data
+        "tft_companion": gather_tft_companion_data(connection=connection, data=data),
+        "ranked": gather_ranked_data(connection=connection, data=data),
+        "gameflow": gather_gameflow_data(connection=connection, data=data),
+        # The queue lookup below depends on the lobby data.
+        "lobby": gather_lobby_data(connection=connection, data=data),
+    }
+    results = await asyncio.gather(
+        *(
+            _timed_request(name, request, timings)
+            for name, request in pending.items()
+        ),
+        return_exceptions=True,
+    )
+    for name, result in zip(pending, results):
+        if isinstance(result, BaseException):
+            logger.warning(
+                f"Failed to gather {name} data from the League Client API: {result!r}"
+            )
 
-    await gather_ranked_data(connection=connection, data=data)
+    # Only the queue lookup depends on an earlier result (the lobby's queue_id).
+    try:
+        await _timed_request(
+            "queue",
+            gather_lobby_queue_data(connection=connection, data=data, logger=logger),
+            timings,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to gather queue data from the League Client API: {e!r}")
 
-    await gather_gameflow_data(connection=connection, data=data)
+    logger.debug(
+        f"Gathered base data in {(time.perf_counter() - started) * 1000:.0f}ms: "
+        + ", ".join(f"{name}={took * 1000:.0f}ms" for name, took in timings.items())
+    )
 
-    await gather_lobby_data(connection=connection, data=data)
 
+async def gather_lobby_queue_data(
+    connection: Connection, data: ClientData, logger: Any = None
+) -> None:
+    """Fill in the queue of the current lobby, once gather_lobby_data has set its queue_id."""
     # If queue_id is still -1, no lobby data was available (e.g., already in-game).
     # Skip queue data fetching to avoid API errors.
     if data.queue_id == -1:
@@ -77,9 +130,7 @@ async def gather_base_data(connection: Connection, module_data: "ModuleData") ->
 
         return
 
-    await gather_queue_data(
-        connection=connection, data=data, logger=module_data.logger
-    )
+    await gather_queue_data(connection=connection, data=data, logger=logger)
 
 
 async def gather_queue_data(
@@ -136,6 +187,18 @@ async def gather_queue_data(
         data.gamemode = lobby_queue_info.get(LolGameQueuesQueue.GAME_MODE, data.gamemode)
 
 
+async def gather_locale_data(connection: Connection) -> None:
+    try:
+        region_locale_raw: ClientResponse = await connection.request(  # type:ignore
+            method="GET", endpoint="/riotclient/region-locale"
+        )
+        region_locale: dict[str, Any] = await region_locale_raw.json()
+        locale_provider.set_lcu_locale(region_locale.get("locale"))
+    except Exception:
+        # The locale provider falls back to the --locale argument of the League process.
+        pass
+
+
 async def gather_lobby_data(connection: Connection, data: ClientData) -> None:
     lobby_raw_data: ClientResponse = await connection.request(  # type:ignore
         method="GET", endpoint="/lol-gameflow/v1/gameflow-metadata/player-status"
@@ -1,33 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 import time
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from league_rpc.models.module_data import ModuleData
 
-import requests
 from lcu_driver.connection import Connection  # type:ignore
-from requests.auth import HTTPBasicAuth
 
 from league_rpc.champion import (
-    gather_game_mode,
     gather_ingame_information,
     get_skin_asset,
 )
 from league_rpc.utils.color import Color
-from league_rpc.utils.polling import wait_until_exists
-from league_rpc.gametime import get_current_ingame_time
-from league_rpc.kda import get_creepscore, get_kda, get_level
 from league_rpc.lcu_api.base_data import set_tft_companion_data
+from league_rpc.lcu_api.lcu_client import AsyncLcuClient
 from league_rpc.models.client_data import ArenaStats, RankedStats, TFTStats
+from league_rpc.models.lcu.gameflow_phase import GameFlowPhase
+from league_rpc.models.live_game_snapshot import LiveGameSnapshot
+from league_rpc.models.match_memo import MatchMemo, roster_key
 from league_rpc.models.rpc_data import RPCData
 from league_rpc.utils.const import (
-    ALL_GAME_DATA_URL,
     BASE_MAP_ICON_URL,
     CHAMPION_NAME_CONVERT_MAP,
     DEFAULT_MAP_ICON_FILENAME,
-    GAME_MODE_CONVERT_MAP,
     KNOWN_NORMAL_GAME_MODES,
     LEAGUE_CLASSIC_ICON,
     LEAGUE_OF_LEGENDS_LOGO,
@@ -41,52 +38,8 @@ from league_rpc.utils.const import (
 )
 
 
-async def get_current_state(connection: Connection) -> str:
-    response = await connection.request(  # type:ignore
-        "get", "/lol-gameflow/v1/gameflow-phase"
-    )
-    state = await response.json()
-    return state
-
-
-def get_lcu_data_sync(connection: Connection, endpoint: str) -> Any:
-    """
-    fetch data from the LCU api synchronously
-    """
-    # Inspecting connection details for debugging
-
-    assert endpoint.startswith("/"), "Endpoint must start with a /"
-
-    # Define the endpoint
-    target_endpoint = f"{connection.address}{endpoint}"
-
-    try:
-        # Perform the synchronous GET request
-
-        response = requests.get(
-            target_endpoint,
-            auth=HTTPBasicAuth("riot", connection.auth_key),
-            verify=False,  # Disabling SSL verification; adjust as necessary
-            timeout=30,  # Set a timeout to prevent hanging
-        )
-
-        # Raise an error if the response was not successful
-        response.raise_for_status()
-
-        # Parse the JSON response
-        state = response.json()
-        return state
-
-    except requests.RequestException:
-        return "Error"
-
-
 async def get_ingame_data(connection: Connection) -> dict[str, Any]:
-    response = await connection.request(  # type:ignore
-        "get", "/lol-gameflow/v1/session"
-    )
-    data = await response.json()
-    return data
+    return await AsyncLcuClient.for_connection(connection).get_gameflow_session()
 
 
 def show_ranked_data(
@@ -140,98 +93,141 @@ def show_ranked_data(
     return large_text, small_image, small_text
 
 
-def is_spectating_game() -> bool:
-    """Returns True if the user is spectating (active player endpoint returns non-200)."""
+def handle_spectating(
+    silent: bool,
+    module_data: ModuleData,
+    snapshot: LiveGameSnapshot,
+) -> None:
+    """RPC handler for when the user is spectating a game."""
+    game_mode = snapshot.game_mode
+
+    # Use the first player's champion skin tile when available (non-TFT modes),
+    # otherwise fall back to the mode's map icon (TFT, and any other no-champion mode).
+    large_image = LEAGUE_OF_LEGENDS_LOGO
+    all_players = snapshot.all_players
+    if all_players:
+        first_player = all_players[0]
+        raw_champ = first_player.get("rawChampionName", "").split("_")[-1]
+        skin_id = first_player.get("skinID", 0)
+        if raw_champ and raw_champ not in ("Name", "Unknown", ""):
+            large_image = get_skin_asset(
+                champion_name=raw_champ,
+                skin_id=skin_id,
+                memo=module_data.match_memo,
+            )
+        else:
+            map_number = snapshot.map_number
+            map_name = MAP_ICON_CONVERT_MAP.get(map_number)
+            if map_name:
+                large_image = BASE_MAP_ICON_URL.format(
+                    map_name=map_name,
+                    filename=MAP_ICON_FILENAME_OVERRIDES.get(
+                        map_number, DEFAULT_MAP_ICON_FILENAME
+                    ),
+                )
+
+    if not silent:
+        print("-" * 50)
+        print(f"{Color.yellow}Spectating: {Color.green}{game_mode}{Color.reset}")
+        print("-" * 50)
+
+    module_data.rpc_data = RPCData(
+        large_image=large_image,
+        large_text="Spectating",
+        details=game_mode,
+        state="Spectating",
+        small_image=LEAGUE_CLASSIC_ICON,
+        small_text=SMALL_TEXT,
+        start=int(time.time()) - snapshot.game_time,
+    )
+    trigger_in_game_update(module_data)
+
+
+async def refresh_match_memo(
+    connection: Connection, module_data: ModuleData, snapshot: LiveGameSnapshot
+) -> MatchMemo:
+    """
+    Make sure module_data.match_memo belongs to the match the snapshot was taken from.
+    The LCU is only asked for the gameId when there is no memo yet, or the roster changed.
+    """
+    memo = module_data.match_memo
+    if memo is not None and memo.roster == roster_key(snapshot):
+        return memo
+
+    game_id: int | None = None
     try:
-        r = requests.get(
-            "https://127.0.0.1:2999/liveclientdata/activeplayer",
-            verify=False,
-            timeout=5,
-        )
-        return r.status_code != 200
-    except Exception:
-        return False
+        game_id = (await get_ingame_data(connection)).get("gameData", {}).get("gameId")
+    except Exception as e:
+        # The roster still identifies the match, the gameId is only nice to have.
+        module_data.logger.debug(f"Could not get the gameId from the gameflow session: {e}")
 
+    if memo is not None and memo.matches(game_id, snapshot):
+        memo.roster = roster_key(snapshot)
+    else:
+        memo = module_data.match_memo = MatchMemo.for_game(game_id, snapshot)
+        module_data.logger.debug(f"New match memo for game {memo.game_id or memo.roster}")
+    return memo
 
-def handle_spectating(silent: bool, module_data: ModuleData) -> None:
-    """RPC handler for when the user is spectating a game."""
-    if response := wait_until_exists(
-        url=ALL_GAME_DATA_URL,
-        custom_message="Did not find spectator game data. Will try again in 5 seconds",
-        startup=not silent,
-    ):
-        parsed_data = response.json()
-        game_mode = GAME_MODE_CONVERT_MAP.get(
-            parsed_data["gameData"]["gameMode"],
-            parsed_data["gameData"]["gameMode"],
-        )
-        game_time = int(parsed_data["gameData"]["gameTime"])
-
-        # Use the first player's champion skin tile when available (non-TFT modes),
-        # otherwise fall back to the mode's map icon (TFT, and any other no-champion mode).
-        large_image = LEAGUE_OF_LEGENDS_LOGO
-        all_players = parsed_data.get("allPlayers", [])
-        if all_players:
-            first_player = all_players[0]
-            raw_champ = first_player.get("rawChampionName", "").split("_")[-1]
-            skin_id = first_player.get("skinID", 0)
-            if raw_champ and raw_champ not in ("Name", "Unknown", ""):
-                large_image = get_skin_asset(champion_name=raw_champ, skin_id=skin_id)
-            else:
-                map_number = parsed_data["gameData"].get("mapNumber", 0)
-                map_name = MAP_ICON_CONVERT_MAP.get(map_number)
-                if map_name:
-                    large_image = BASE_MAP_ICON_URL.format(
-                        map_name=map_name,
-                        filename=MAP_ICON_FILENAME_OVERRIDES.get(
-                            map_number, DEFAULT_MAP_ICON_FILENAME
-                        ),
-                    )
 
-        if not silent:
-            print("-" * 50)
-            print(f"{Color.yellow}Spectating: {Color.green}{game_mode}{Color.reset}")
-            print("-" * 50)
-
-        module_data.rpc_data = RPCData(
-            large_image=large_image,
-            large_text="Spectating",
-            details=game_mode,
-            state="Spectating",
-            small_image=LEAGUE_CLASSIC_ICON,
-            small_text=SMALL_TEXT,
-            start=int(time.time()) - game_time,
-        )
-        module_data.rpc_updater.trigger_rpc_update(module_data)
+def trigger_in_game_update(module_data: ModuleData) -> None:
+    """
+    Sends the in-game presence, unless the game is over by now. The handlers run in worker
+    threads, which carry on even after stop_in_game_loop cancelled the in-game loop.
+    """
+    if not module_data.gameflow.call_in_phase(
+        (GameFlowPhase.IN_PROGRESS, GameFlowPhase.WATCHING),
+        lambda: module_data.rpc_updater.trigger_rpc_update(module_data),
+    ):
+        module_data.logger.debug("The game is over, dropping its last in-game update")
 
 
-def handle_in_game(
+async def handle_in_game(
     connection: Connection,
     silent: bool,
     module_data: ModuleData,
-) -> None:
+    spectating: bool = False,
+    snapshot: LiveGameSnapshot | None = None,
+) -> LiveGameSnapshot | None:
     """
     Executes the appropriate function based on the current game mode.
+    Returns the snapshot the presence was built from, or None if the game data was unavailable.
 
     silent, is meant to not display console output if the inGame has already been ran
 
+    Runs on the lcu_driver event loop. The game is polled through module_data.live_client,
+    the handlers themselves resolve champion/skin assets against DDragon, so they run
+    in a worker thread. Pass a snapshot to re-render the presence without polling the game.
     """
+    # A single /allgamedata request per tick, every handler below reads from this snapshot.
     # Use startup=not silent: retry on first call, fail fast on subsequent polling calls
-    game_mode = gather_game_mode(startup=not silent)
+    if snapshot is None:
+        snapshot = await module_data.live_client.get_snapshot(startup=not silent)
+    if snapshot is None:
+        return None
 
-    # Guard: if the active player endpoint is unavailable we are spectating, not playing
-    if is_spectating_game():
-        handle_spectating(silent=silent, module_data=module_data)
-        return
+    await refresh_match_memo(connection, module_data, snapshot)
+
+    # Guard: if there is no active player in the game data we are spectating, not playing
+    if spectating or snapshot.is_spectating:
+        await asyncio.to_thread(handle_spectating, silent, module_data, snapshot)
+        return snapshot
+
+    game_mode = snapshot.game_mode
 
     if game_mode == "TFT":
-        handle_tft_game(connection, silent, module_data)
+        if not silent:
+            # only gather this data once.
+            set_tft_companion_data(
+                module_data.client_data,
+                await AsyncLcuClient.for_connection(connection).get_tft_companions(),
+            )
+        handler = handle_tft_game
     elif game_mode == "Arena":
-        handle_arena_game(silent, module_data)
+        handler = handle_arena_game
     elif game_mode == "Swarm":
-        handle_swarm_game(silent, module_data)
+        handler = handle_swarm_game
     elif game_mode == "Ultimate Spellbook":
-        handle_ultimate_spellbook_game(silent, module_data)
+        handler = handle_ultimate_spellbook_game
     else:
         # Anything else (Summoner's Rift, ARAM, URF, Brawl, Doom Bots, future/unknown
         # modes like new champion-select-based game modes, etc.) is treated as a
@@ -241,12 +237,16 @@ def handle_in_game(
             module_data.logger.warning(
                 f"Unrecognized game mode '{game_mode}', falling back to normal game handling."
             )
-        handle_normal_game(silent, module_data)
+        handler = handle_normal_game
+
+    await asyncio.to_thread(handler, silent, module_data, snapshot)
+    return snapshot
 
 
 def handle_ultimate_spellbook_game(
     silent: bool,
     module_data: ModuleData,
+    snapshot: LiveGameSnapshot,
 ) -> None:
     """
     Gather data specific to summoners rift games
@@ -259,11 +259,14 @@ def handle_ultimate_spellbook_game(
         gamemode,
         _,
         _,
-    ) = gather_ingame_information(silent=silent)
+    ) = gather_ingame_information(
+        snapshot=snapshot, silent=silent, memo=module_data.match_memo
+    )
 
     skin_asset = get_skin_asset(
         champion_name=champ_name,
         skin_id=skin_id,
+        memo=module_data.match_memo,
     )
     if not champ_name or not gamemode:
         return
@@ -283,17 +286,18 @@ def handle_ultimate_spellbook_game(
         large_image=skin_asset,
         large_text=large_text,
         details=module_data.client_data.get_queue_name,
-        state=f"In Game {f'· {get_kda()} · {get_creepscore()}' if not module_data.cli_args.no_stats else ''}",
+        state=f"In Game {f'· {snapshot.kda} · {snapshot.creepscore}' if not module_data.cli_args.no_stats else ''}",
         small_image=small_image,
         small_text=small_text,
-        start=int(time.time())
-        - get_current_ingame_time(default_time=module_data.start_time),
+        start=int(time.time()) - snapshot.game_time,
     )
 
-    module_data.rpc_updater.trigger_rpc_update(module_data)
+    trigger_in_game_update(module_data)
 
 
-def handle_swarm_game(silent: bool, module_data: ModuleData) -> None:
+def handle_swarm_game(
+    silent: bool, module_data: ModuleData, snapshot: LiveGameSnapshot
+) -> None:
     """
     Gather data specific to Swarm games
     """
@@ -308,10 +312,13 @@ def handle_swarm_game(silent: bool, module_data: ModuleData) -> None:
         _,  # gamemode
         level,
         gold,
-    ) = gather_ingame_information(silent=silent)
+    ) = gather_ingame_information(
+        snapshot=snapshot, silent=silent, memo=module_data.match_memo
+    )
     skin_asset: str = get_skin_asset(
         champion_name=champ_name,
         skin_id=skin_id,
+        memo=module_data.match_memo,
     )
     large_text = (
         f"{skin_name} ({chroma_name})"
@@ -327,17 +334,18 @@ def handle_swarm_game(silent: bool, module_data: ModuleData) -> None:
         large_image=skin_asset,
         large_text=large_text,
         details=module_data.client_data.get_queue_name,
-        state=f"In Game {f'· {get_creepscore()} · lvl: {level} · gold: {gold}' if not module_data.cli_args.no_stats else ''}",
+        state=f"In Game {f'· {snapshot.creepscore} · lvl: {level} · gold: {gold}' if not module_data.cli_args.no_stats else ''}",
         small_image=LEAGUE_CLASSIC_ICON,
         small_text=SMALL_TEXT,
-        start=int(time.time())
-        - get_current_ingame_time(default_time=module_data.start_time),
+        start=int(time.time()) - snapshot.game_time,
     )
 
-    module_data.rpc_updater.trigger_rpc_update(module_data)
+    trigger_in_game_update(module_data)
 
 
-def handle_arena_game(silent: bool, module_data: ModuleData) -> None:
+def handle_arena_game(
+    silent: bool, module_data: ModuleData, snapshot: LiveGameSnapshot
+) -> None:
     """
     Gather data specific to Arena games
     """
@@ -354,11 +362,14 @@ def handle_arena_game(silent: bool, module_data: ModuleData) -> None:
         _,  # gamemode
         level,
         gold,
-    ) = gather_ingame_information(silent=silent)
+    ) = gather_ingame_information(
+        snapshot=snapshot, silent=silent, memo=module_data.match_memo
+    )
 
     skin_asset: str = get_skin_asset(
         champion_name=champ_name,
         skin_id=skin_id,
+        memo=module_data.match_memo,
     )
     large_text = (
         f"{skin_name} ({chroma_name})"
@@ -384,19 +395,19 @@ def handle_arena_game(silent: bool, module_data: ModuleData) -> None:
         large_image=skin_asset,
         large_text=large_text,
         details=module_data.client_data.get_queue_name,
-        state=f"In Game {f'· {get_kda()} · lvl: {level} · gold: {gold}' if not module_data.cli_args.no_stats else ''}",
+        state=f"In Game {f'· {snapshot.kda} · lvl: {level} · gold: {gold}' if not module_data.cli_args.no_stats else ''}",
         small_image=small_image,
         small_text=small_text,
-        start=int(time.time())
-        - get_current_ingame_time(default_time=module_data.start_time),
+        start=int(time.time()) - snapshot.game_time,
     )
 
-    module_data.rpc_updater.trigger_rpc_update(module_data)
+    trigger_in_game_update(module_data)
 
 
 def handle_normal_game(
     silent: bool,
     module_data: ModuleData,
+    snapshot: LiveGameSnapshot,
 ) -> None:
     """
     Gather data specific to summoners rift games
@@ -409,11 +420,14 @@ def handle_normal_game(
         gamemode,
         _,
         _,
-    ) = gather_ingame_information(silent=silent)
+    ) = gather_ingame_information(
+        snapshot=snapshot, silent=silent, memo=module_data.match_memo
+    )
 
     skin_asset = get_skin_asset(
         champion_name=champ_name,
         skin_id=skin_id,
+        memo=module_data.match_memo,
     )
     if not champ_name or not gamemode:
         return
@@ -443,33 +457,29 @@ def handle_normal_game(
         large_image=skin_asset,
         large_text=large_text,
         details=module_data.client_data.get_queue_name,
-        state=f"In Game {f'· {get_kda()} · {get_creepscore()}' if not module_data.cli_args.no_stats else ''}",
+        state=f"In Game {f'· {snapshot.kda} · {snapshot.creepscore}' if not module_data.cli_args.no_stats else ''}",
         small_image=small_image,
         small_text=small_text,
-        start=int(time.time())
-        - get_current_ingame_time(default_time=module_data.start_time),
+        start=int(time.time()) - snapshot.game_time,
     )
-    module_data.rpc_updater.trigger_rpc_update(module_data)
+    trigger_in_game_update(module_data)
 
 
 def handle_tft_game(
-    connection: Connection, silent: bool, module_data: ModuleData
+    silent: bool,
+    module_data: ModuleData,
+    snapshot: LiveGameSnapshot,
 ) -> None:
-    if not silent:
-        # only gather this data once.
-        companion_data_json = get_lcu_data_sync(
-            connection, endpoint="/lol-cosmetics/v1/inventories/tft/companions"
-        )
-        set_tft_companion_data(module_data.client_data, companion_data_json)
-
+    """
+    Gather data specific to TFT games. The companion is fetched by handle_in_game.
+    """
     module_data.rpc_data = RPCData(
         large_image=module_data.client_data.tft_companion_icon,
         large_text=module_data.client_data.tft_companion_name,
         details=module_data.client_data.get_queue_name,
-        state=f"In Game · lvl: {get_level()}",
+        state=f"In Game · lvl: {snapshot.level}",
         small_image=LEAGUE_CLASSIC_ICON,
         small_text=SMALL_TEXT,
-        start=int(time.time())
-        - get_current_ingame_time(default_time=module_data.start_time),
+        start=int(time.time()) - snapshot.game_time,
     )
-    module_data.rpc_updater.trigger_rpc_update(module_data)
+    trigger_in_game_update(module_data)
@@ -0,0 +1,112 @@
+"""
+REST clients for the LCU (League Client Update) API, bound to an lcu_driver Connection.
+
+AsyncLcuClient reuses the aiohttp session lcu_driver already opened for the connection, which
+carries the Basic auth header, and records the latency of every endpoint it calls.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import aiohttp
+from lcu_driver.connection import Connection  # type:ignore
+
+from league_rpc import metrics
+
+
+@dataclass
+class EndpointLatency:
+    """Number of calls and their total/max duration, for a single endpoint."""
+
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def average_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+_latencies: dict[str, EndpointLatency] = {}
+_latencies_lock = threading.Lock()
+
+_request_seconds = metrics.histogram(
+    "league_rpc_lcu_request_seconds", "Duration of LCU API requests.", ["endpoint"]
+)
+
+
+def record_latency(endpoint: str, seconds: float) -> None:
+    """Count a call to endpoint (without its query string) that took seconds."""
+    endpoint = endpoint.split("?")[0]
+    _request_seconds.observe(seconds, endpoint=endpoint)
+    with _latencies_lock:
+        latency = _latencies.setdefault(endpoint, EndpointLatency())
+        latency.calls += 1
+        latency.total_seconds += seconds
+        latency.max_seconds = max(latency.max_seconds, seconds)
+
+
+def endpoint_latencies() -> dict[str, EndpointLatency]:
+    """Return a copy of the latency counters, keyed by endpoint."""
+    with _latencies_lock:
+        return {
+            endpoint: EndpointLatency(
+                latency.calls, latency.total_seconds, latency.max_seconds
+            )
+            for endpoint, latency in _latencies.items()
+        }
+
+
+def format_endpoint_latencies() -> str:
+    """Return the latency counters as a single human readable line."""
+    return ", ".join(
+        f"{endpoint} calls={latency.calls} avg={latency.average_seconds * 1000:.0f}ms "
+        f"max={latency.max_seconds * 1000:.0f}ms"
+        for endpoint, latency in endpoint_latencies().items()
+    )
+
+
+class AsyncLcuClient:
+    """LCU client on top of lcu_driver's aiohttp session for the connection."""
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+
+    @classmethod
+    def for_connection(cls, connection: Connection) -> "AsyncLcuClient":
+        """Return the client bound to this connection, creating it on first use."""
+        client = connection.locals.get("async_lcu_client")
+        if client is None:
+            client = connection.locals["async_lcu_client"] = cls(connection)
+        return client
+
+    async def get(self, endpoint: str) -> Any:
+        """GET endpoint and return the parsed JSON. Raises aiohttp.ClientError on failure."""
+        assert endpoint.startswith("/"), "Endpoint must start with a /"
+
+        session: Optional[aiohttp.ClientSession] = self.connection.session
+        if session is None or session.closed:
+            raise aiohttp.ClientConnectionError("The LCU connection is closed")
+
+        started = time.perf_counter()
+        try:
+            # The session already carries the Basic auth and JSON headers.
+            async with session.get(
+                f"{self.connection.address}{endpoint}", ssl=False
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+        finally:
+            record_latency(endpoint, time.perf_counter() - started)
+
+    async def get_gameflow_session(self) -> dict[str, Any]:
+        return await self.get("/lol-gameflow/v1/session")
+
+    async def get_tft_companions(self) -> dict[str, Any]:
+        return await self.get("/lol-cosmetics/v1/inventories/tft/companions")
+
+    async def get_current_summoner(self) -> dict[str, Any]:
+        return await self.get("/lol-summoner/v1/current-summoner")
+
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from argparse import Namespace
 from typing import Any, Optional
@@ -14,6 +15,7 @@ from league_rpc.disable_native_rpc.disable import (
     DISCORD_PLUGIN_BLOB,
 )
 from league_rpc.lcu_api.base_data import gather_base_data, set_tft_companion_data
+from league_rpc.lcu_api.lcu_client import AsyncLcuClient, format_endpoint_latencies
 from league_rpc.logger.richlogger import RichLogger
 from league_rpc.models.client_data import ArenaStats, ClientData, RankedStats, TFTStats
 from league_rpc.models.lcu.current_chat_status import LolChatUser
@@ -22,7 +24,8 @@ from league_rpc.models.lcu.gameflow_phase import GameFlowPhase
 from league_rpc.models.module_data import ModuleData
 from league_rpc.models.rpc_data import RPCData
 from league_rpc.models.rpc_updater import RPCUpdater
-from league_rpc.processes.process import processes_exists
+from league_rpc.processes.locale_provider import locale_provider
+from league_rpc.processes.process import league_client_tracker
 from league_rpc.utils.const import (
     ARAM_CUSTOM_GAME_QUEUE_IDS,
     CUSTOM_GAME_QUEUE_IDS,
@@ -40,29 +43,28 @@ module_data = ModuleData(
 async def connect(connection: Connection) -> None:
     """
     This function will be called when the connection to the League Client API is established.
+
+    Runs on lcu_driver's event loop, next to the websocket. Nothing in here may block,
+    otherwise client events queue up until it's done.
     """
     logger = module_data.logger
     rpc_updater = module_data.rpc_updater
 
-    logger.start_progress_bar(name="Start LeagueRPC Engine")
-    time.sleep(1)
+    module_data.loop_monitor.logger = logger
+    module_data.loop_monitor.start()
 
+    logger.start_progress_bar(name="Start LeagueRPC Engine")
     logger.info("Connected to the League Client API.")
     logger.update_progress_bar(advance=20)
 
-    time.sleep(0.5)  # Give the client some time to load
-    logger.update_progress_bar(advance=10)
-
-    time.sleep(0.5)  # Give the client some time to load
-    logger.update_progress_bar(advance=10)
+    # Give the client some time to load, until it can tell us who's logged in.
+    await wait_for_client_ready(connection)
+    logger.update_progress_bar(advance=30)
 
-    time.sleep(0.5)
-    logger.update_progress_bar(advance=20)
-
-    time.sleep(2)
     await gather_base_data(connection=connection, module_data=module_data)
+    module_data.gameflow.set(module_data.client_data.gameflow_phase)
     logger.info("Successfully gathered base data.")
-    logger.update_progress_bar(advance=20)
+    logger.update_progress_bar(advance=30)
 
     rpc_updater.delay_update(module_data=module_data, connection=connection)
     logger.info("Discord RPC successfully updated")
@@ -70,9 +72,8 @@ async def connect(connection: Connection) -> None:
 
     logger.stop_progress_bar()
 
-    time.sleep(0.5)
-
     logger.info("LeagueRPC is ready!", color="cyan")
+    logger.debug(f"Event loop during startup: {module_data.loop_monitor}")
 
     # if game_path := find_game_path():
     #     native_presence = check_plugin_status(file_path=game_path, logger=logger)
@@ -83,6 +84,22 @@ async def connect(connection: Connection) -> None:
     #         )
 
 
+async def wait_for_client_ready(
+    connection: Connection, timeout: float = 10, interval: float = 0.5
+) -> None:
+    """Wait until the client answers for the current summoner, or timeout seconds passed."""
+    deadline = time.monotonic() + timeout
+    client = AsyncLcuClient.for_connection(connection)
+    while time.monotonic() < deadline:
+        try:
+            await client.get_current_summoner()
+            return
+        except Exception:
+            # The client may not accept requests yet.
+            pass
+        await asyncio.sleep(interval)
+
+
 @module_data.connector.close  # type:ignore
 async def disconnect(_: Connection) -> None:
     """
@@ -91,13 +108,21 @@ async def disconnect(_: Connection) -> None:
     logger = module_data.logger
     logger.info("Disconnected from the League Client API.", color="red")
 
-    league_processes: list[str] = ["LeagueClient.exe", "LeagueClientUx.exe"]
+    module_data.rpc_updater.stop_in_game_loop()
+    await module_data.live_client.close()
+    # A restarted client may use another locale, read it from the new client process.
+    locale_provider.set_lcu_locale(None)
+
+    logger.debug(f"Event loop while connected: {module_data.loop_monitor}")
+    logger.debug(f"LCU endpoint latencies: {format_endpoint_latencies()}")
+    logger.debug(f"RPC updates: {module_data.rpc_updater.update_debouncer}")
+    logger.debug(f"Discord presence {module_data.presence}")
 
     logger.info(
         "Will attemt to reconnect in 5 seconds, if the client is still running."
     )
-    time.sleep(5)
-    if not processes_exists(league_processes):
+    await asyncio.sleep(5)
+    if not league_client_tracker.is_running():
         # When we close leagueRPC, re-enable the native presence plugin.
         # This prevents users needing to repair the client, the next time they open league.
         # if game_path := find_game_path():
@@ -114,7 +139,8 @@ async def disconnect(_: Connection) -> None:
         #             )
 
         # Give people time to read the last messages.
-        time.sleep(3)
+        await asyncio.sleep(3)
+        module_data.loop_monitor.stop()
         await module_data.connector.stop()
 
 
@@ -202,6 +228,14 @@ async def gameflow_phase_updated(
         return None
 
     module_data.client_data.gameflow_phase = event.data  # type:ignore
+    module_data.gameflow.set(event.data)  # type:ignore
+
+    if event.data != GameFlowPhase.IN_PROGRESS:  # type:ignore
+        # Whatever was resolved for the last match doesn't apply to the next one.
+        module_data.match_memo = None
+
+    # Stop polling the game right away, update_rpc starts a new loop if the new phase needs one.
+    module_data.rpc_updater.stop_in_game_loop()
     module_data.rpc_updater.delay_update(module_data=module_data, connection=connection)
 
 
@@ -377,8 +411,6 @@ def start_connector(
 
     module_data.rpc_updater.start_heartbeat(module_data)
 
-    league_processes: list[str] = ["LeagueClient.exe", "LeagueClientUx.exe"]
-
     while True:
         try:
             module_data.connector.start()
@@ -394,6 +426,6 @@ def start_connector(
                 "Attempting to reconnect in 5 seconds, if the client is still running."
             )
             time.sleep(5)
-            if processes_exists(league_processes):
+            if league_client_tracker.is_running():
                 continue
         break
@@ -0,0 +1,139 @@
+"""
+Asyncio client for the Live Client Data API (https://127.0.0.1:2999).
+
+The in-game loop runs it on the lcu_driver event loop, so polling the game costs no thread of
+its own and can be cancelled as soon as the gameflow phase changes.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import aiohttp
+
+from league_rpc import metrics
+from league_rpc.models.live_game_snapshot import LiveGameSnapshot
+from league_rpc.utils.const import ALL_GAME_DATA_URL
+from league_rpc.utils.http_client import record_connection
+
+_polls = metrics.counter(
+    "league_rpc_local_api_polls_total",
+    "Polls of the Live Client Data API, by result.",
+    ["result"],
+)
+_poll_seconds = metrics.histogram(
+    "league_rpc_local_api_poll_seconds", "Duration of Live Client Data API polls."
+)
+
+
+async def _on_request_start(
+    _: aiohttp.ClientSession,
+    ctx: SimpleNamespace,
+    params: aiohttp.TraceRequestStartParams,
+) -> None:
+    ctx.host, ctx.port = params.url.host, params.url.port
+    record_connection(ctx.host, ctx.port)
+
+
+async def _on_connection_create_start(
+    _: aiohttp.ClientSession,
+    ctx: SimpleNamespace,
+    __: aiohttp.TraceConnectionCreateStartParams,
+) -> None:
+    record_connection(ctx.host, ctx.port, opened=True)
+
+
+class LiveClientDataClient:
+    """Polls the Live Client Data API over one keep-alive aiohttp session.
+
+    The session is created lazily, so it belongs to the event loop that first uses it.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10,
+        n_sleep: float = 5,
+        n_total_amount: int = 20,
+    ) -> None:
+        self.timeout = timeout
+        self.n_sleep = n_sleep
+        self.n_total_amount = n_total_amount
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_start.append(_on_request_start)
+            trace_config.on_connection_create_start.append(_on_connection_create_start)
+
+            self._session = aiohttp.ClientSession(
+                # The game uses a self-signed certificate.
+                connector=aiohttp.TCPConnector(ssl=False),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[trace_config],
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the underlying session. A new one is created on the next request."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def get_json(self, url: str) -> Optional[Any]:
+        """Single request without retries. Returns the parsed JSON body, or None."""
+        try:
+            async with self._get_session().get(url) as response:
+                if response.status != 200:
+                    return None
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+
+    async def wait_until_exists(
+        self,
+        url: str,
+        custom_message: str = "",
+        expected_response_code: int = 200,
+        startup: bool = False,
+    ) -> Optional[Any]:
+        """
+        Polling on the local riot api until success is returned.
+        Returns the parsed JSON body, or None.
+        """
+        session = self._get_session()
+
+        for _ in range(self.n_total_amount):
+            try:
+                with _poll_seconds.time():
+                    async with session.get(url) as response:
+                        if response.status == expected_response_code:
+                            data = await response.json(content_type=None)
+                            _polls.inc(result="ok")
+                            return data
+                _polls.inc(result="unexpected_status")
+                await asyncio.sleep(self.n_sleep)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                _polls.inc(result="connection_error")
+                # These errors occur either before the api has started..
+                # Or when the game has ended
+                if startup:
+                    # Make sure we continue to poll the api during the start of a game.
+                    await asyncio.sleep(self.n_sleep)
+                    continue
+
+                # When game ends, we don't care about polling the api.
+                return None
+
+        print(custom_message)
+        return None
+
+    async def get_snapshot(self, startup: bool = False) -> Optional[LiveGameSnapshot]:
+        """Fetch /liveclientdata/allgamedata once and parse it into a LiveGameSnapshot."""
+        if data := await self.wait_until_exists(
+            url=ALL_GAME_DATA_URL,
+            custom_message="Did not find game data.. Will try again in 5 seconds",
+            startup=startup,
+        ):
+            return LiveGameSnapshot.from_all_game_data(data)
+        return None
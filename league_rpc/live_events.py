@@ -0,0 +1,99 @@
+"""
+Incremental consumer of the Live Client Data event feed (/liveclientdata/eventdata).
+
+The feed remembers the ID of the next event it expects, so every poll only returns events
+that haven't been seen yet. Kills, deaths and assists of the active player are applied to the
+last LiveGameSnapshot as they happen, so a kill can be shown on Discord within a second,
+without re-polling the full game data.
+"""
+
+import dataclasses
+from typing import Any, Optional
+
+from league_rpc.live_client_data import LiveClientDataClient
+from league_rpc.models.live_game_snapshot import LiveGameSnapshot
+from league_rpc.utils.const import EVENT_DATA_URL
+
+# How often the event feed is polled between two full game data ticks.
+EVENT_POLL_INTERVAL_SECONDS = 1
+
+RELEVANT_EVENTS = ("ChampionKill", "FirstBlood", "Multikill", "GameEnd")
+
+
+class LiveEventFeed:
+    """Keeps the eventdata cursor of a single game and applies new events to a snapshot."""
+
+    def __init__(self) -> None:
+        self.next_event_id: int = 0
+        self.game_ended: bool = False
+
+    def sync(self, snapshot: LiveGameSnapshot) -> None:
+        """Move the cursor past every event in the snapshot, since its scores already include them."""
+        events: list[dict[str, Any]] = (
+            snapshot.all_game_data.get("events", {}).get("Events") or []
+        )
+        for event in events:
+            self.next_event_id = max(self.next_event_id, int(event["EventID"]) + 1)
+
+    async def poll(self, client: LiveClientDataClient) -> list[dict[str, Any]]:
+        """Fetch the events that happened since the last poll."""
+        data = await client.get_json(
+            EVENT_DATA_URL.format_map({"event_id": self.next_event_id})
+        )
+        if not isinstance(data, dict):
+            return []
+
+        new_events: list[dict[str, Any]] = []
+        for event in data.get("Events") or []:
+            event_id = int(event.get("EventID", -1))
+            if event_id < self.next_event_id:
+                continue
+            self.next_event_id = event_id + 1
+            if event.get("EventName") in RELEVANT_EVENTS:
+                new_events.append(event)
+        return new_events
+
+    def apply(
+        self, snapshot: LiveGameSnapshot, events: list[dict[str, Any]]
+    ) -> Optional[LiveGameSnapshot]:
+        """
+        Apply new events to the KDA of the active player.
+        Returns the updated snapshot, or None if nothing we display has changed.
+        """
+        player = snapshot.current_player or {}
+        names = {
+            snapshot.riot_id,
+            snapshot.riot_id_game_name,
+            player.get("summonerName", ""),
+        } - {""}
+
+        kills, deaths, assists = snapshot.kills, snapshot.deaths, snapshot.assists
+        game_time = snapshot.game_time
+
+        for event in events:
+            match event["EventName"]:
+                case "ChampionKill":
+                    kills += event.get("KillerName") in names
+                    deaths += event.get("VictimName") in names
+                    assists += any(name in names for name in event.get("Assisters", []))
+                case "GameEnd":
+                    self.game_ended = True
+                case _:
+                    # FirstBlood and Multikill always come together with a ChampionKill.
+                    continue
+            game_time = max(game_time, int(event.get("EventTime", 0)))
+
+        if (kills, deaths, assists) == (
+            snapshot.kills,
+            snapshot.deaths,
+            snapshot.assists,
+        ):
+            return None
+
+        return dataclasses.replace(
+            snapshot,
+            kills=kills,
+            deaths=deaths,
+            assists=assists,
+            game_time=game_time,
+        )
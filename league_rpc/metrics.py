@@ -0,0 +1,335 @@
+"""
+Counters, gauges and histograms describing what LeagueRPC does during a session, e.g. how long LCU
+and DDragon requests take, how often caches hit, and how many updates were sent to Discord.
+
+Metrics are created once, at module level, next to the code they measure:
+    lookups = metrics.counter("league_rpc_cache_lookups_total", "Cache lookups.", ["result"])
+    lookups.inc(result="miss")
+
+Creating a metric that already exists returns the existing one. Everything is kept in memory by
+the module-level `registry`, which renders the Prometheus text format or JSON. With --metrics-file,
+a MetricsWriter writes a snapshot to that file every few seconds.
+"""
+
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+# Upper bounds (in seconds) of the histogram buckets, fit for local and remote HTTP requests.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULT_WRITE_INTERVAL_SECONDS = 15
+
+LabelValues = tuple[str, ...]
+
+
+class Metric(ABC):
+    """A named metric, with one value per combination of label values."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects the labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        """(name suffix, labels, value) of every sample, as they appear in the Prometheus format."""
+
+    @abstractmethod
+    def to_json(self) -> list[dict[str, Any]]:
+        """Every sample, as it appears in the JSON snapshot."""
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            return [
+                ("", dict(zip(self.labelnames, key)), value)
+                for key, value in self._values.items()
+            ]
+
+    def to_json(self) -> list[dict[str, Any]]:
+        return [{"labels": labels, "value": value} for _, labels, value in self.samples()]
+
+
+class Gauge(Counter):
+    """A value that can go up and down."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._functions: dict[LabelValues, Callable[[], Optional[float]]] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], Optional[float]], **labels: Any) -> None:
+        """Compute the value with function whenever the gauge is read, e.g. the age of a cache.
+        The sample is left out while function returns None.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            functions = list(self._functions.items())
+        computed = [
+            ("", dict(zip(self.labelnames, key)), value)
+            for key, function in functions
+            if (value := function()) is not None
+        ]
+        return super().samples() + computed
+
+
+class Histogram(Metric):
+    """Counts observed values into fixed buckets, and keeps their count and sum."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: the count of every bucket (not cumulative, +Inf last), and the sum.
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe how long the with block took, also when it raised."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _snapshot(self) -> list[tuple[dict[str, str], list[int], float]]:
+        with self._lock:
+            return [
+                (dict(zip(self.labelnames, key)), list(counts), self._sums[key])
+                for key, counts in self._counts.items()
+            ]
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        samples: list[tuple[str, dict[str, str], float]] = []
+        for labels, counts, total in self._snapshot():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                samples.append(("_bucket", {**labels, "le": le}, cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+    def to_json(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "labels": labels,
+                "buckets": {
+                    f"{bound:g}": count for bound, count in zip(self.buckets, counts)
+                }
+                | {"+Inf": counts[-1]},
+                "sum": total,
+                "count": sum(counts),
+            }
+            for labels, counts, total in self._snapshot()
+        ]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Every metric of the process, by name."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"{name} is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets)
+
+    def metrics(self) -> list[Metric]:
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                label_text = ",".join(
+                    f'{name}="{_escape(label)}"' for name, label in labels.items()
+                )
+                label_text = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{metric.name}{suffix}{label_text} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> str:
+        """Render every metric as a JSON document."""
+        return json.dumps(
+            {
+                "timestamp": time.time(),
+                "metrics": {
+                    metric.name: {
+                        "type": metric.type,
+                        "help": metric.help,
+                        "samples": metric.to_json(),
+                    }
+                    for metric in self.metrics()
+                },
+            },
+            indent=2,
+        )
+
+
+registry = MetricsRegistry()
+counter = registry.counter
+gauge = registry.gauge
+histogram = registry.histogram
+
+# Shared by several modules, labelled by the source or scanner that was timed.
+http_request_seconds = histogram(
+    "league_rpc_http_request_seconds",
+    "Duration of HTTP requests to DDragon and Meraki Analytics.",
+    ["source"],
+)
+process_scan_seconds = histogram(
+    "league_rpc_process_scan_seconds", "Duration of scans of the running processes.", ["scanner"]
+)
+
+
+class MetricsWriter:
+    """Writes a snapshot of the registry to a file every `interval` seconds, on a daemon thread.
+
+    The format follows the file extension: JSON for .json, the Prometheus text format otherwise.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        interval: float = DEFAULT_WRITE_INTERVAL_SECONDS,
+        metrics_registry: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self.registry = metrics_registry or registry
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop writing, after one last snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval)
+        self.write()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self) -> None:
+        """Write the snapshot atomically, so readers never see half a file."""
+        if self.path.suffix == ".json":
+            text = self.registry.to_json()
+        else:
+            text = self.registry.to_prometheus()
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as file:
+                    file.write(text)
+                os.replace(tmp, self.path)
+            except OSError:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            # Metrics are best effort, never worth crashing over.
+            pass
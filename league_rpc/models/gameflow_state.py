@@ -0,0 +1,85 @@
+"""
+This module defines the GameflowState class, which holds the gameflow phase (Lobby, ChampSelect,
+InProgress, ...) reported by the LCU websocket, and wakes up everyone waiting for it to change.
+
+Usage:
+    The websocket handler for /lol-gameflow/v1/gameflow-phase publishes every new phase with set().
+    Code that has to react to the phase changing, like the in-game loop, waits on it with
+    wait_for_change() (threads) or wait_for_change_async() (coroutines) instead of polling the LCU.
+    Both return as soon as the phase differs from the one the caller knows, or when the timeout
+    runs out, which makes them usable as an interruptible sleep.
+"""
+
+import asyncio
+import threading
+from typing import Callable, Optional
+
+
+class GameflowState:
+    """The current gameflow phase, with a condition variable for threads and events for coroutines."""
+
+    def __init__(self, phase: str = "None") -> None:
+        self._phase = phase
+        self._condition = threading.Condition()
+        # Coroutines waiting for a change, with the event loop their event belongs to.
+        self._async_waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self.changes = 0
+
+    @property
+    def phase(self) -> str:
+        with self._condition:
+            return self._phase
+
+    def set(self, phase: str) -> bool:
+        """Publish the current phase. Returns whether it changed, waking up all waiters if so."""
+        with self._condition:
+            if phase == self._phase:
+                return False
+            self._phase = phase
+            self.changes += 1
+            self._condition.notify_all()
+            for waiter in list(self._async_waiters):
+                loop, changed = waiter
+                try:
+                    loop.call_soon_threadsafe(changed.set)
+                except RuntimeError:
+                    # Left behind by a closed loop, e.g. after reconnecting to the client.
+                    self._async_waiters.discard(waiter)
+        return True
+
+    def call_in_phase(self, phases: tuple[str, ...], fn: Callable[[], None]) -> bool:
+        """Call fn if the phase is one of `phases`, and return whether it was called. The phase
+        can't change while fn runs, so set() (and whatever reacts to the new phase) comes after it.
+        """
+        with self._condition:
+            if self._phase not in phases:
+                return False
+            fn()
+            return True
+
+    def wait_for_change(self, phase: str, timeout: Optional[float] = None) -> bool:
+        """Block until the phase is no longer `phase`. Returns False if the timeout ran out first."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._phase != phase, timeout)
+
+    async def wait_for_change_async(
+        self, phase: str, timeout: Optional[float] = None
+    ) -> bool:
+        """Like wait_for_change, without blocking the event loop."""
+        changed = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), changed)
+        with self._condition:
+            if self._phase != phase:
+                return True
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._async_waiters.discard(waiter)
+        return self.phase != phase
+
+    def __str__(self) -> str:
+        return f"phase={self.phase} changes={self.changes}"
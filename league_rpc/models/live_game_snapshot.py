@@ -0,0 +1,93 @@
+"""
+This module defines the LiveGameSnapshot class, a parsed view of a single response from the
+Live Client Data API endpoint /liveclientdata/allgamedata. Every value the in-game Rich Presence
+handlers need (riotId, game mode, game time, level, gold, KDA and creep score) is already part of
+that one document, so a snapshot is taken once per in-game tick and handed to every handler.
+
+Usage:
+    Instead of asking /activeplayer, /playerscores and /gamestats separately for each value,
+    fetch /allgamedata once, build a snapshot with LiveGameSnapshot.from_all_game_data and read
+    the values from it. This keeps the number of localhost HTTPS round trips per tick at one.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from league_rpc.utils.const import GAME_MODE_CONVERT_MAP
+
+
+@dataclass
+class LiveGameSnapshot:
+    """A dataclass holding the values parsed from one /liveclientdata/allgamedata response,
+    together with the raw document for consumers that need more than the parsed fields.
+    """
+
+    all_game_data: dict[str, Any] = field(default_factory=dict, repr=False)
+    riot_id: str = ""
+    riot_id_game_name: str = ""
+    game_mode: str = ""
+    game_time: int = 0
+    map_number: int = 0
+    level: int = 0
+    gold: int = 0
+    kills: int = 0
+    deaths: int = 0
+    assists: int = 0
+    creep_score: int = 0
+    is_spectating: bool = False
+
+    # The allPlayers entry of the active player, None while spectating or if it wasn't found.
+    current_player: Optional[dict[str, Any]] = field(default=None, repr=False)
+
+    @classmethod
+    def from_all_game_data(cls, all_game_data: dict[str, Any]) -> "LiveGameSnapshot":
+        """Build a snapshot from a parsed /liveclientdata/allgamedata response."""
+        game_data: dict[str, Any] = all_game_data.get("gameData", {})
+        active_player: dict[str, Any] = all_game_data.get("activePlayer") or {}
+
+        raw_game_mode: str = game_data.get("gameMode", "")
+        riot_id: str = active_player.get("riotId", "")
+
+        snapshot = cls(
+            all_game_data=all_game_data,
+            riot_id=riot_id,
+            riot_id_game_name=active_player.get("riotIdGameName", ""),
+            game_mode=GAME_MODE_CONVERT_MAP.get(raw_game_mode, raw_game_mode),
+            game_time=int(game_data.get("gameTime", 0)),
+            map_number=int(game_data.get("mapNumber", 0)),
+            level=int(active_player.get("level", 0)),
+            gold=int(active_player.get("currentGold", 0)),
+            # While spectating, activePlayer only holds an "error" message instead of player data.
+            is_spectating=not riot_id,
+        )
+
+        for player in snapshot.all_players:
+            if riot_id and player.get("riotId") == riot_id:
+                scores: dict[str, Any] = player.get("scores", {})
+                snapshot.current_player = player
+                snapshot.kills = int(scores.get("kills", 0))
+                snapshot.deaths = int(scores.get("deaths", 0))
+                snapshot.assists = int(scores.get("assists", 0))
+                snapshot.creep_score = int(scores.get("creepScore", 0))
+                break
+
+        return snapshot
+
+    @property
+    def all_players(self) -> list[dict[str, Any]]:
+        """Return the allPlayers list of the game."""
+        return self.all_game_data.get("allPlayers") or []
+
+    @property
+    def kda(self) -> str:
+        """Return the KDA of the active player formatted as kills/deaths/assists."""
+        if self.current_player is None:
+            return ""
+        return f"{self.kills}/{self.deaths}/{self.assists}"
+
+    @property
+    def creepscore(self) -> str:
+        """Return the creepScore of the active player. Riot updates it every 10cs."""
+        if self.current_player is None:
+            return ""
+        return f"{self.creep_score}cs"
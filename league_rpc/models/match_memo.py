@@ -0,0 +1,51 @@
+"""
+This module defines the MatchMemo class, which keeps everything about the current match that can't
+change while it is being played: the champion, skin and chroma of the player, the skin tile URLs
+and the game locale.
+
+Usage:
+    A MatchMemo is created on the first in-game tick and stored on ModuleData. It is identified by
+    the gameId of the LCU gameflow session, or by the roster of the game if no gameId is available.
+    Every later tick of the same match reads the resolved values from it, instead of asking DDragon,
+    Meraki and the process list again. It is dropped when the gameflow phase leaves InProgress.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from league_rpc.models.live_game_snapshot import LiveGameSnapshot
+
+
+def roster_key(snapshot: LiveGameSnapshot) -> str:
+    """Identify a match by its game mode and the riotIds of its players."""
+    riot_ids = sorted(player.get("riotId", "") for player in snapshot.all_players)
+    return f"{snapshot.game_mode}:{','.join(riot_ids)}"
+
+
+@dataclass
+class MatchMemo:
+    """A dataclass holding the resolved champion, skin and locale data of a single match."""
+
+    game_id: Optional[int] = None
+    roster: str = ""
+
+    locale: Optional[str] = None
+
+    # (champion_name, skin_id, skin_name, chroma_name), as returned by gather_league_data.
+    league_data: Optional[tuple[Any, ...]] = None
+
+    # (champion_name, skin_id) -> skin tile URL
+    skin_assets: dict[tuple[str, int], str] = field(default_factory=dict)
+
+    @classmethod
+    def for_game(
+        cls, game_id: Optional[int], snapshot: LiveGameSnapshot
+    ) -> "MatchMemo":
+        """Create an empty memo for the match the snapshot was taken from."""
+        return cls(game_id=game_id or None, roster=roster_key(snapshot))
+
+    def matches(self, game_id: Optional[int], snapshot: LiveGameSnapshot) -> bool:
+        """Check if the memo belongs to the match with this gameId (or roster, if there is no gameId)."""
+        if game_id and self.game_id:
+            return game_id == self.game_id
+        return roster_key(snapshot) == self.roster
@@ -19,9 +19,9 @@ from typing import TYPE_CHECKING, Optional
 if TYPE_CHECKING:
     from league_rpc.models.rpc_data import RPCData
     from league_rpc.models.client_data import ClientData
+    from league_rpc.models.match_memo import MatchMemo
     from league_rpc.models.rpc_updater import RPCUpdater
 
-import threading
 import time
 from argparse import Namespace
 from dataclasses import dataclass, field
@@ -29,7 +29,11 @@ from dataclasses import dataclass, field
 from lcu_driver.connector import Connector
 from pypresence import Presence
 
+from league_rpc.live_client_data import LiveClientDataClient
 from league_rpc.logger.richlogger import RichLogger
+from league_rpc.models.gameflow_state import GameflowState
+from league_rpc.presence_dispatcher import PresenceDispatcher
+from league_rpc.utils.loop_monitor import LoopLagMonitor
 
 
 # contains module internal data
@@ -48,14 +52,27 @@ class ModuleData:
     rpc_data: "RPCData"
 
     connector: Connector = field(default_factory=Connector)
+
+    # Polls the Live Client Data API (127.0.0.1:2999) on the connector's event loop while in game
+    live_client: LiveClientDataClient = field(default_factory=LiveClientDataClient)
+
+    # The gameflow phase as pushed by the websocket, to wait on instead of polling the LCU
+    gameflow: GameflowState = field(default_factory=GameflowState)
+
+    # Champion, skin and locale of the match being played, cleared when the game is over
+    match_memo: Optional["MatchMemo"] = None
+
     logger: RichLogger = field(default_factory=RichLogger)
+
+    # Measures how long the connector's event loop was blocked
+    loop_monitor: LoopLagMonitor = field(default_factory=LoopLagMonitor)
+
     cli_args: Optional[Namespace] = None
     start_time = int(time.time())
 
     # Discord Rich Presence instance from pypresence
     rpc: Optional[Presence] = None
 
-    # pypresence isn't thread-safe: the LCU event thread, the heartbeat thread, and the
-    # reclaim burst thread can all call rpc.update()/rpc.clear() concurrently. Every
-    # caller must hold this lock while touching rpc.
-    rpc_lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    # pypresence isn't thread-safe, so nothing but this dispatcher's thread may call rpc.
+    # Updates, heartbeats and reclaim bursts are all scheduled on it.
+    presence: PresenceDispatcher = field(default_factory=PresenceDispatcher)
@@ -10,26 +10,32 @@ Usage:
     which could disrupt the user experience or exceed API rate limits.
 """
 
+import asyncio
 import copy
 import inspect
 import time
-from dataclasses import dataclass, field
-from threading import Thread, Timer
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+from typing import Any
 
 import pypresence
 from lcu_driver.connection import Connection  # type:ignore
 
+from league_rpc import metrics
 from league_rpc.lcu_api.helpers import (
-    get_lcu_data_sync,
     handle_in_game,
-    handle_spectating,
     show_ranked_data,
 )
+from league_rpc.latest_version import version_resolver
+from league_rpc.live_events import EVENT_POLL_INTERVAL_SECONDS, LiveEventFeed
 from league_rpc.models.client_data import ClientData
 from league_rpc.models.lcu.current_chat_status import LolChatUser
 from league_rpc.models.lcu.gameflow_phase import GameFlowPhase
+from league_rpc.models.live_game_snapshot import LiveGameSnapshot
 from league_rpc.models.module_data import ModuleData
 from league_rpc.models.rpc_data import RPCData
+from league_rpc.presence_dispatcher import CLEAR, HEARTBEAT, RECLAIM, UPDATE
+from league_rpc.skin_tiles import skin_tile_cache
 from league_rpc.utils.const import (
     BASE_MAP_ICON_URL,
     DEFAULT_MAP_ICON_FILENAME,
@@ -40,6 +46,18 @@ from league_rpc.utils.const import (
     PROFILE_ICON_BASE_URL,
     SMALL_TEXT,
 )
+from league_rpc.utils.debounce import Debouncer
+from league_rpc.utils.http_client import format_connection_stats
+from league_rpc.utils.polling import AdaptivePollScheduler
+
+_triggers = metrics.counter(
+    "league_rpc_presence_triggers_total",
+    "Requests to update the Rich Presence, by result (queued, unchanged).",
+    ["result"],
+)
+_resends = metrics.counter(
+    "league_rpc_presence_resends_total", "Resends of the last activity, by the heartbeat or a reclaim."
+)
 
 
 # Discord has no publicly documented rate limit for activity updates. This value is a
@@ -53,9 +71,12 @@ HEARTBEAT_INTERVAL_SECONDS = 5
 RECLAIM_BURST_COUNT = 4
 RECLAIM_BURST_INTERVAL_SECONDS = 1.5
 
+# LCU events arriving within this many seconds of each other are handled by a single update.
+UPDATE_DELAY_SECONDS = 1.5
+
 
 # As some events are called multiple times, we should limit the amount of updates to the RPC.
-# Collect update events for 1 second and then update the RPC.
+# Collect update events for UPDATE_DELAY_SECONDS and then update the RPC once.
 @dataclass
 class RPCUpdater:
     """A dataclass responsible for scheduling and executing updates to the Discord Rich Presence,
@@ -65,16 +86,29 @@ class RPCUpdater:
     previous_client_data: ClientData | None = field(default=None, init=False)
     previous_rpc_data: RPCData | None = field(default=None, init=False)
     last_sent_was_clear: bool = field(default=False, init=False)
+    # Whether the last trigger_rpc_update asked for a clear, sent or not.
+    last_requested_clear: bool = field(default=False, init=False)
     last_sent_at: float = field(default=0.0, init=False)
     last_sent_details: str = field(default="", init=False)
 
+    # The in-game polling loop, running as a task on the lcu_driver event loop.
+    in_game_task: Future[None] | None = field(default=None, init=False)
+    # The poll scheduler of the current (or last) game, exposes its interval and tick count.
+    in_game_scheduler: AdaptivePollScheduler | None = field(default=None, init=False)
+    # Runs update_rpc on a single worker thread, once per burst of LCU events.
+    update_debouncer: Debouncer = field(
+        default_factory=lambda: Debouncer(UPDATE_DELAY_SECONDS, name="rpc-update"),
+        init=False,
+    )
+
     def trigger_rpc_update(
         self,
         module_data: ModuleData,
         clear_instead_of_update: bool = False,
     ) -> None:
         """
-        Handles the update of the Rich Presence with the provided data, catching and logging any exceptions that occur.
+        Queues the update of the Rich Presence with the current data, replacing any update (and
+        reclaim burst) that hasn't been sent yet.
         """
 
         # Debugging what function called trigger_rpc_update
@@ -85,72 +119,114 @@ class RPCUpdater:
 
         if self.has_rpc_data_changed(module_data.rpc_data):
             self.previous_rpc_data = copy.copy(module_data.rpc_data)
-            try:
-                module_data.logger.debug("Updating Discord Rich Presence")
-
-                with module_data.rpc_lock:
-                    if clear_instead_of_update:
-                        module_data.logger.debug("Clearing Discord Rich Presence")
-                        module_data.rpc.clear()  # type:ignore
-                    else:
-                        module_data.rpc.update(  # type: ignore
-                            large_image=module_data.rpc_data.large_image,
-                            large_text=module_data.rpc_data.large_text,
-                            small_image=module_data.rpc_data.small_image,
-                            small_text=module_data.rpc_data.small_text,
-                            details=module_data.rpc_data.details,
-                            state=module_data.rpc_data.state,
-                            start=module_data.rpc_data.start,
-                        )
-
-                self.last_sent_was_clear = clear_instead_of_update
-                self.last_sent_at = time.monotonic()
-                self.last_sent_details = module_data.rpc_data.details
-
-                if not clear_instead_of_update:
-                    self._start_reclaim_burst(module_data)
-
-            except Exception as e:
-                module_data.logger.debug(
-                    f"Exception occured while updating discord: {e}"
-                )
+            self.last_requested_clear = clear_instead_of_update
+            rpc_data = self.previous_rpc_data
+            module_data.presence.schedule(
+                UPDATE,
+                lambda: self._activity(module_data, rpc_data, clear_instead_of_update),
+                cancel=(UPDATE, RECLAIM),
+                on_sent=lambda activity: self._activity_sent(
+                    module_data, activity, clear_instead_of_update
+                ),
+            )
+            _triggers.inc(result="queued")
         else:
+            _triggers.inc(result="unchanged")
             module_data.logger.debug("RPC data has not changed. Skipping update.")
 
+    @staticmethod
+    def _activity(
+        module_data: ModuleData, rpc_data: RPCData, clear_instead_of_update: bool
+    ) -> dict[str, Any]:
+        """What to send to Discord for rpc_data. Runs on the presence dispatcher."""
+        module_data.logger.debug("Updating Discord Rich Presence")
+
+        if clear_instead_of_update:
+            module_data.logger.debug("Clearing Discord Rich Presence")
+            return CLEAR
+        return {
+            "large_image": rpc_data.large_image,
+            "large_text": rpc_data.large_text,
+            "small_image": rpc_data.small_image,
+            "small_text": rpc_data.small_text,
+            "details": rpc_data.details,
+            "state": rpc_data.state,
+            "start": rpc_data.start,
+        }
+
+    def _activity_sent(
+        self,
+        module_data: ModuleData,
+        activity: dict[str, Any],
+        clear_instead_of_update: bool,
+    ) -> None:
+        self.last_sent_was_clear = clear_instead_of_update
+        self.last_sent_at = time.monotonic()
+        self.last_sent_details = activity.get("details", "")
+
+        if not clear_instead_of_update:
+            self._start_reclaim_burst(module_data)
+
     def start_heartbeat(self, module_data: ModuleData) -> None:
-        """Starts a background loop that resends our last activity every
-        HEARTBEAT_INTERVAL_SECONDS, so League's own Rich Presence can't outlast us.
+        """Resends our last activity every HEARTBEAT_INTERVAL_SECONDS, so League's own Rich
+        Presence can't outlast us.
         """
-        Thread(target=self._heartbeat_loop, args=(module_data,), daemon=True).start()
+        module_data.presence.on_reconnect = lambda: self.replay_last_activity(
+            module_data
+        )
+        module_data.presence.schedule(
+            HEARTBEAT,
+            self._last_activity,
+            delay=HEARTBEAT_INTERVAL_SECONDS,
+            repeat=self._next_heartbeat_delay,
+            cancel=(HEARTBEAT,),
+            on_sent=lambda activity: self._resent(module_data, activity),
+        )
 
-    def _heartbeat_loop(self, module_data: ModuleData) -> None:
-        # Sleep relative to the last actual send (real or heartbeat) rather than a
+    def replay_last_activity(self, module_data: ModuleData) -> None:
+        """Sends what we last meant to show again, e.g. once Discord restarted and forgot it.
+        Updates lost while Discord was gone are covered, since this is always the latest one.
+        """
+        if self.previous_rpc_data is None:
+            return
+        rpc_data = self.previous_rpc_data
+        clear_instead_of_update = self.last_requested_clear
+        module_data.presence.schedule(
+            UPDATE,
+            lambda: self._activity(module_data, rpc_data, clear_instead_of_update),
+            cancel=(UPDATE, RECLAIM),
+            on_sent=lambda activity: self._activity_sent(
+                module_data, activity, clear_instead_of_update
+            ),
+        )
+
+    def _next_heartbeat_delay(self) -> float:
+        # Wait relative to the last actual send (real or heartbeat) rather than a
         # fixed schedule, so a real update mid-cycle doesn't cost a whole extra
         # HEARTBEAT_INTERVAL_SECONDS before the next heartbeat is allowed to fire.
-        while True:
-            time_since_last_send = time.monotonic() - self.last_sent_at
-            time.sleep(max(HEARTBEAT_INTERVAL_SECONDS - time_since_last_send, 1))
-            self._resend_last_activity(module_data)
+        time_since_last_send = time.monotonic() - self.last_sent_at
+        return max(HEARTBEAT_INTERVAL_SECONDS - time_since_last_send, 1)
 
     def _start_reclaim_burst(self, module_data: ModuleData) -> None:
-        """Fires a few quick resends right after a real update, so we reclaim the
+        """Queues a few quick resends right after a real update, so we reclaim the
         display before League's own presence reacts to the same state change.
         """
-        Thread(target=self._reclaim_burst, args=(module_data,), daemon=True).start()
-
-    def _reclaim_burst(self, module_data: ModuleData) -> None:
-        for _ in range(RECLAIM_BURST_COUNT):
-            time.sleep(RECLAIM_BURST_INTERVAL_SECONDS)
-            self._resend_last_activity(module_data, force=True)
+        for i in range(1, RECLAIM_BURST_COUNT + 1):
+            module_data.presence.schedule(
+                RECLAIM,
+                lambda: self._last_activity(force=True),
+                delay=i * RECLAIM_BURST_INTERVAL_SECONDS,
+                on_sent=lambda activity: self._resent(module_data, activity),
+            )
 
-    def _resend_last_activity(self, module_data: ModuleData, force: bool = False) -> None:
-        """Re-sends the last activity we set, skipping if we have nothing to
-        show, deliberately cleared our presence, or would exceed Discord's rate limit.
+    def _last_activity(self, force: bool = False) -> dict[str, Any] | None:
+        """The last activity we set, to send again. None if we have nothing to show,
+        deliberately cleared our presence, or would exceed Discord's rate limit.
         """
         if self.previous_rpc_data is None or self.last_sent_was_clear:
-            return
+            return None
         if not force and time.monotonic() - self.last_sent_at < HEARTBEAT_INTERVAL_SECONDS:
-            return
+            return None
 
         # Discord appears to ignore a SET_ACTIVITY call if the activity payload is
         # byte-identical to what's already active, so a plain resend never displaces
@@ -160,24 +236,23 @@ class RPCUpdater:
         if details == self.last_sent_details:
             details += "​"
 
-        try:
-            with module_data.rpc_lock:
-                module_data.rpc.update(  # type: ignore
-                    large_image=self.previous_rpc_data.large_image,
-                    large_text=self.previous_rpc_data.large_text,
-                    small_image=self.previous_rpc_data.small_image,
-                    small_text=self.previous_rpc_data.small_text,
-                    details=details,
-                    state=self.previous_rpc_data.state,
-                    start=self.previous_rpc_data.start,
-                )
-            self.last_sent_at = time.monotonic()
-            self.last_sent_details = details
-            module_data.logger.debug(
-                f"Heartbeat: resent activity at {time.strftime('%H:%M:%S')}"
-            )
-        except Exception as e:
-            module_data.logger.debug(f"Heartbeat resend failed: {e}")
+        return {
+            "large_image": self.previous_rpc_data.large_image,
+            "large_text": self.previous_rpc_data.large_text,
+            "small_image": self.previous_rpc_data.small_image,
+            "small_text": self.previous_rpc_data.small_text,
+            "details": details,
+            "state": self.previous_rpc_data.state,
+            "start": self.previous_rpc_data.start,
+        }
+
+    def _resent(self, module_data: ModuleData, activity: dict[str, Any]) -> None:
+        self.last_sent_at = time.monotonic()
+        self.last_sent_details = activity["details"]
+        _resends.inc()
+        module_data.logger.debug(
+            f"Heartbeat: resent activity at {time.strftime('%H:%M:%S')}"
+        )
 
     def has_client_data_changed(self, current_client_data: ClientData) -> bool:
         """
@@ -206,7 +281,7 @@ class RPCUpdater:
         module_data: ModuleData,
         connection: Connection,
     ) -> None:
-        """Schedules an update if one is not already scheduled within a short delay (1 second)."""
+        """Schedules an update after a short delay, merged with any other update scheduled meanwhile."""
 
         # Debugging what function called delay_update
         if module_data.cli_args.debug:  # type:ignore
@@ -216,11 +291,10 @@ class RPCUpdater:
 
         # Check if the client data has changed
         if self.has_client_data_changed(module_data.client_data):
-            Timer(
-                interval=1.5,
-                function=self.update_rpc_and_reset_flag,
-                args=(module_data, connection),
-            ).start()
+            self.update_debouncer.logger = module_data.logger
+            self.update_debouncer.submit(
+                self.update_rpc_and_reset_flag, module_data, connection
+            )
 
     def update_rpc_and_reset_flag(
         self, module_data: ModuleData, connection: Connection
@@ -436,54 +510,145 @@ class RPCUpdater:
         )
         self.trigger_rpc_update(module_data)
 
+    def start_in_game_loop(
+        self, module_data: ModuleData, connection: Connection, phase: str
+    ) -> None:
+        """Schedules the in-game loop on the lcu_driver event loop, unless it is already running."""
+        if self.in_game_task is not None and not self.in_game_task.done():
+            return
+
+        loop = module_data.connector.loop
+        if loop.is_closed():
+            return
+
+        self.in_game_task = asyncio.run_coroutine_threadsafe(
+            self._in_game_loop(module_data, connection, phase), loop
+        )
+
+    def stop_in_game_loop(self) -> None:
+        """Cancels the in-game loop, e.g. as soon as the gameflow phase changes."""
+        if self.in_game_task is not None:
+            self.in_game_task.cancel()
+            self.in_game_task = None
+
+    async def _in_game_loop(
+        self, module_data: ModuleData, connection: Connection, phase: str
+    ) -> None:
+        spectating = phase == GameFlowPhase.WATCHING
+        event_feed = LiveEventFeed()
+        scheduler = self.in_game_scheduler = AdaptivePollScheduler()
+        try:
+            await handle_in_game(
+                connection=connection,
+                silent=False,
+                module_data=module_data,
+                spectating=spectating,
+            )  # Print champion details
+            # The gameflow phase is pushed by the websocket, every wait below returns as soon
+            # as it changes. No need to ask the LCU for it on every tick.
+            while module_data.gameflow.phase == phase:
+                snapshot = await handle_in_game(
+                    connection=connection,
+                    silent=True,  # No prints here, since we've already done so, just update the RPC
+                    module_data=module_data,
+                    spectating=spectating,
+                )
+                # The start timestamp shifts by a second now and then, it's not a real change.
+                interval = scheduler.observe(
+                    replace(module_data.rpc_data, start=0)
+                )
+                module_data.logger.debug(f"In-game poll scheduler: {scheduler}")
+                await self._follow_game_events(
+                    module_data,
+                    connection,
+                    event_feed,
+                    snapshot,
+                    phase=phase,
+                    duration=interval,
+                )
+        except asyncio.CancelledError:
+            # The gameflow phase changed, update_rpc takes it from here.
+            raise
+        except Exception as e:
+            module_data.logger.debug(f"In-game loop stopped: {e}")
+        finally:
+            module_data.logger.debug(
+                f"In-game loop finished after {scheduler}. Local API connections: {format_connection_stats()}"
+            )
+            module_data.logger.debug(f"DDragon version cache: {version_resolver}")
+            module_data.logger.debug(f"Skin tile cache: {skin_tile_cache}")
+
+        # After the game is over, we will drop back to the main client.
+        self.in_client_rpc(module_data=module_data)
+
+    async def _follow_game_events(
+        self,
+        module_data: ModuleData,
+        connection: Connection,
+        event_feed: LiveEventFeed,
+        snapshot: LiveGameSnapshot | None,
+        phase: str,
+        duration: float,
+    ) -> None:
+        """Waits for `duration` seconds until the next full tick, or until the gameflow phase is
+        no longer `phase`. Meanwhile the event feed is polled, and the presence is refreshed as
+        soon as a kill, death or assist happens.
+        """
+        if (
+            snapshot is None
+            or snapshot.current_player is None
+            or snapshot.game_mode == "TFT"
+            or event_feed.game_ended
+        ):
+            # Nothing on the event feed changes what we show.
+            await module_data.gameflow.wait_for_change_async(phase, duration)
+            return
+
+        event_feed.sync(snapshot)
+        deadline = time.monotonic() + duration
+        while (remaining := deadline - time.monotonic()) > 0:
+            if await module_data.gameflow.wait_for_change_async(
+                phase, min(EVENT_POLL_INTERVAL_SECONDS, remaining)
+            ):
+                return
+            if event_feed.game_ended:
+                continue
+
+            events = await event_feed.poll(module_data.live_client)
+            if updated_snapshot := event_feed.apply(snapshot, events):
+                module_data.logger.debug(
+                    f"Game event(s) {[event['EventName'] for event in events]}, refreshing presence"
+                )
+                snapshot = updated_snapshot
+                await handle_in_game(
+                    connection=connection,
+                    silent=True,
+                    module_data=module_data,
+                    snapshot=snapshot,
+                )
+
     # The function that updates discord rich presence, depending on the data
     def update_rpc(self, module_data: ModuleData, connection: Connection) -> None:
         """
         Determines the appropriate Rich Presence status based on the game flow phase and updates Discord.
         """
         data: ClientData = module_data.client_data
-        rpc: pypresence.Presence | None = module_data.rpc
+        rpc: pypresence.Presence | pypresence.AioPresence | None = module_data.rpc
 
-        if not isinstance(rpc, pypresence.Presence):
-            # Only continue if rpc is of type Presence.
+        if not isinstance(rpc, (pypresence.Presence, pypresence.AioPresence)):
+            # Only continue if rpc is of type Presence (or AioPresence, with --async-presence).
             module_data.logger.error("RPC is not of type Presence")
             return
 
         match data.gameflow_phase:
             # This value will be set by "/lol-gameflow/v1/gameflow-phase"
-            case GameFlowPhase.IN_PROGRESS:
-                handle_in_game(
-                    connection=connection,
-                    silent=False,
+            case GameFlowPhase.IN_PROGRESS | GameFlowPhase.WATCHING:
+                # Polls the game until the gameflow phase changes.
+                self.start_in_game_loop(
                     module_data=module_data,
-                )  # Print champion details
-                while (
-                    get_lcu_data_sync(
-                        connection=connection,
-                        endpoint="/lol-gameflow/v1/gameflow-phase",
-                    )
-                    == GameFlowPhase.IN_PROGRESS
-                ):
-                    handle_in_game(
-                        connection=connection,
-                        silent=True,  # No prints here, since we've already done so, just update the RPC
-                        module_data=module_data,
-                    )
-                    time.sleep(10)
-                # After the game is over, we will drop back to the main client.
-                self.in_client_rpc(module_data=module_data)
-            case GameFlowPhase.WATCHING:
-                handle_spectating(silent=False, module_data=module_data)
-                while (
-                    get_lcu_data_sync(
-                        connection=connection,
-                        endpoint="/lol-gameflow/v1/gameflow-phase",
-                    )
-                    == GameFlowPhase.WATCHING
-                ):
-                    handle_spectating(silent=True, module_data=module_data)
-                    time.sleep(10)
-                self.in_client_rpc(module_data=module_data)
+                    connection=connection,
+                    phase=data.gameflow_phase,
+                )
             case GameFlowPhase.READY_CHECK:
                 # When the READY check comes. We want to just ignore (IN_QUEUE rpc will still show.)
                 return
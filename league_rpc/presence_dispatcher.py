@@ -0,0 +1,585 @@
+"""
+The only owner of the Discord (pypresence) connection.
+
+Every call to Discord goes through one worker, which runs a queue of scheduled sends. Sends that
+are due run in priority order: real updates first, then reclaim bursts, heartbeats and the
+placeholder rotation. Each send belongs to a kind, and scheduling a new send can cancel whatever is
+still pending for some kinds, so a newer update replaces an older one instead of being queued behind
+it. The thread count stays the same, no matter how many updates are made.
+
+When a send finds the IPC pipe dead, the dispatcher stops sending, retries the connection with
+backoff (see reconnect.DiscordSupervisor) and calls on_reconnect once Discord is back.
+
+All sends share one token bucket. A send that finds it empty is held back until the next token,
+and a newer send replaces the one held back, so what goes out is always the latest.
+
+A send is a function returning what to send: the keyword arguments of Presence.update, CLEAR, or
+None to skip. The dispatcher does the actual I/O, so the same sends work with both backends:
+PresenceDispatcher, a thread around the blocking pypresence.Presence, and AsyncPresenceDispatcher,
+a single event loop around pypresence.AioPresence (--async-presence).
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Optional, Union
+
+import pypresence  # type:ignore
+from pypresence import AioPresence, Presence  # type:ignore
+
+from league_rpc import metrics
+from league_rpc.logger.richlogger import RichLogger
+from league_rpc.reconnect import DiscordSupervisor
+from league_rpc.utils.rate_limit import TokenBucket
+
+# Kinds of sends, by priority. When several sends are due, the lowest value goes first.
+RECONNECT = 0  # Not a send, an attempt to reconnect to Discord. See reconnect.DiscordSupervisor.
+UPDATE = 1
+RECLAIM = 2
+HEARTBEAT = 3
+PLACEHOLDER = 4
+
+KIND_NAMES = {
+    RECONNECT: "reconnect",
+    UPDATE: "update",
+    RECLAIM: "reclaim",
+    HEARTBEAT: "heartbeat",
+    PLACEHOLDER: "placeholder",
+}
+
+# Kinds that only resend the latest activity. While Discord is gone they're skipped like any other
+# send, but not counted as lost, as nothing new is missing from the presence.
+RESENDS = (RECLAIM, HEARTBEAT)
+
+# Returned by a send to clear the presence instead of updating it.
+CLEAR: dict[str, Any] = {}
+
+# The keyword arguments for Presence.update, CLEAR, or None to send nothing.
+Activity = Optional[dict[str, Any]]
+
+# Returns the delay before the send runs again, or None to stop repeating.
+Repeat = Union[float, Callable[[], Optional[float]], None]
+
+# Discord doesn't document a limit for SET_ACTIVITY. These defaults let an update and its reclaim
+# burst through, and can be changed with --presence-rate and --presence-burst.
+DEFAULT_SEND_RATE = 1.0  # Sends per second, on average.
+DEFAULT_SEND_BURST = 5
+
+# Errors meaning the IPC pipe to Discord is gone, and a reconnect is needed.
+PIPE_ERRORS = (
+    pypresence.exceptions.PipeClosed,
+    pypresence.exceptions.InvalidPipe,
+    pypresence.exceptions.ResponseTimeout,
+    ConnectionError,
+    OSError,
+)
+
+_sends = metrics.counter(
+    "league_rpc_discord_sends_total",
+    "Sends to Discord, by kind and result (sent, failed, lost, throttled, dropped).",
+    ["kind", "result"],
+)
+_connected = metrics.gauge(
+    "league_rpc_discord_connected", "1 while the IPC connection to Discord is up."
+)
+
+
+@dataclass
+class ScheduledSend:
+    """Something to send to Discord once `due` (time.monotonic) is reached."""
+
+    due: float
+    kind: int
+    action: Callable[[], Activity]
+    repeat: Repeat = None
+    # Called with what was sent, once Discord accepted it.
+    on_sent: Optional[Callable[[dict[str, Any]], None]] = None
+    cancelled: bool = False
+    seq: int = field(default=0)
+
+
+class PresenceDispatcher:
+    """Runs every send to Discord on a single thread, by due time and priority."""
+
+    def __init__(
+        self, logger: Optional[RichLogger] = None, limiter: Optional[TokenBucket] = None
+    ) -> None:
+        self.logger = logger
+        self.rpc: Optional[Presence] = None
+        self.limiter = limiter or TokenBucket(DEFAULT_SEND_RATE, DEFAULT_SEND_BURST)
+        self.supervisor = DiscordSupervisor(logger=logger)
+        # Called once the connection to Discord is back, to replay what we last showed.
+        self.on_reconnect: Optional[Callable[[], None]] = None
+
+        self.sent = {kind: 0 for kind in KIND_NAMES}
+        self.failed = {kind: 0 for kind in KIND_NAMES}
+        self.cancelled = 0
+        self.throttled = 0  # Sends held back, waiting for a token.
+        self.dropped = 0  # Sends held back, then replaced by a newer one.
+
+        self._condition = threading.Condition()
+        self._seq = itertools.count()
+        # Sends waiting for their due time, and sends that are due, waiting for their turn.
+        self._timers: list[tuple[float, int, int, ScheduledSend]] = []
+        self._ready: list[tuple[int, int, ScheduledSend]] = []
+        self._pending: dict[int, list[ScheduledSend]] = {kind: [] for kind in KIND_NAMES}
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        # The send held back by the limiter, with what it's going to send. Guarded by _guard().
+        self._held: Optional[tuple[ScheduledSend, dict[str, Any]]] = None
+
+    def attach(self, rpc: Presence, logger: Optional[RichLogger] = None) -> None:
+        """Hand over the connected Presence, and start the worker thread."""
+        with self._condition:
+            self.rpc = rpc
+            self.logger = self.supervisor.logger = logger or self.logger
+            self._stopped = False
+            _connected.set(1)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="presence-dispatcher", daemon=True
+                )
+                self._thread.start()
+
+    def schedule(
+        self,
+        kind: int,
+        action: Callable[[], Activity],
+        delay: float = 0.0,
+        repeat: Repeat = None,
+        cancel: tuple[int, ...] = (),
+        on_sent: Optional[Callable[[dict[str, Any]], None]] = None,
+    ) -> ScheduledSend:
+        """Send what action() returns in `delay` seconds, after cancelling every send still
+        pending for the kinds in `cancel`.
+        """
+        send = ScheduledSend(
+            due=time.monotonic() + delay,
+            kind=kind,
+            action=action,
+            repeat=repeat,
+            on_sent=on_sent,
+            seq=next(self._seq),
+        )
+        with self._condition:
+            self._enqueue(send, cancel)
+        return send
+
+    def cancel(self, *kinds: int) -> None:
+        """Cancel every pending send of the given kinds."""
+        with self._condition:
+            self._cancel_kinds(kinds)
+
+    def close(self, timeout: float = 5) -> None:
+        """Drop everything still pending, then clear the presence and close the connection."""
+        with self._condition:
+            for kind in KIND_NAMES:
+                self._cancel(kind)
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+        # Discord may have already closed the IPC pipe on its end (e.g. Discord was closed, or
+        # the pipe timed out), which pypresence surfaces as PyPresenceException (PipeClosed,
+        # ResponseTimeout, ...). This is best-effort cleanup on the way out, hence the broad except.
+        if self.rpc is None:
+            return
+        try:
+            self.rpc.clear()
+        except Exception:
+            pass
+        try:
+            self.rpc.close()
+        except Exception:
+            pass
+
+    def _guard(self) -> ContextManager[Any]:
+        """Held by the worker while it touches the queue, which other threads schedule into."""
+        return self._condition
+
+    def _enqueue(self, send: ScheduledSend, cancel: tuple[int, ...]) -> None:
+        self._cancel_kinds(cancel)
+        self._push(send)
+
+    def _cancel_kinds(self, kinds: tuple[int, ...]) -> None:
+        for kind in kinds:
+            self._cancel(kind)
+
+    def _push(self, send: ScheduledSend, track: bool = True) -> None:
+        if track:
+            self._pending[send.kind].append(send)
+        heapq.heappush(self._timers, (send.due, send.kind, send.seq, send))
+        self._wake()
+
+    def _wake(self) -> None:
+        self._condition.notify()
+
+    def _cancel(self, kind: int) -> None:
+        for send in self._pending[kind]:
+            send.cancelled = True
+            self.cancelled += 1
+        self._pending[kind].clear()
+        # A held back send already left _pending, it's superseded all the same.
+        if self._held is not None and self._held[0].kind == kind:
+            self._dropped(self._held[0])
+            self._held = None
+
+    def _take_due(self) -> tuple[Optional[ScheduledSend], Optional[float]]:
+        """Return the most important due send, or else how long until the next one is due.
+        Must be called holding _guard().
+        """
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, kind, seq, send = heapq.heappop(self._timers)
+            if not send.cancelled:
+                heapq.heappush(self._ready, (kind, seq, send))
+
+        while self._ready:
+            _, _, send = heapq.heappop(self._ready)
+            if not send.cancelled:
+                # A repeating send stays pending (and cancellable) while it runs.
+                if send.repeat is None:
+                    self._pending[send.kind].remove(send)
+                return send, None
+
+        return None, self._timers[0][0] - now if self._timers else None
+
+    def _take_work(
+        self,
+    ) -> tuple[Optional[ScheduledSend], Optional[dict[str, Any]], Optional[float]]:
+        """Return the held back send once there's a token for it, with its activity. Otherwise
+        the most important due send (without activity), or how long to wait for either.
+        Must be called holding _guard().
+        """
+        if self._held is not None and self.limiter.try_acquire():
+            (send, activity), self._held = self._held, None
+            return send, activity, None
+
+        send, timeout = self._take_due()
+        if send is None and self._held is not None:
+            token_delay = self.limiter.delay()
+            timeout = token_delay if timeout is None else min(timeout, token_delay)
+        return send, None, timeout
+
+    def _admit(self, send: ScheduledSend, activity: dict[str, Any]) -> bool:
+        """Whether activity can be sent right away. If not, it's held back in place of
+        whatever was held back before.
+        """
+        if self.limiter.try_acquire():
+            if self._held is not None:
+                # Was waiting for a token, but this one is newer.
+                self._dropped(self._held[0])
+                self._held = None
+            return True
+
+        self.throttled += 1
+        _sends.inc(kind=KIND_NAMES[send.kind], result="throttled")
+        if self._held is not None:
+            # Resends only repeat the latest update, so they never replace a held back update.
+            if self._held[0].kind < send.kind:
+                self._dropped(send)
+                return False
+            self._dropped(self._held[0])
+        self._held = (send, activity)
+        return False
+
+    def _dropped(self, send: ScheduledSend) -> None:
+        self.dropped += 1
+        _sends.inc(kind=KIND_NAMES[send.kind], result="dropped")
+
+    def _sent(self, send: ScheduledSend, activity: dict[str, Any]) -> None:
+        self.sent[send.kind] += 1
+        _sends.inc(kind=KIND_NAMES[send.kind], result="sent")
+        if send.on_sent is not None:
+            send.on_sent(activity)
+
+    def _failed(self, send: ScheduledSend, error: Exception) -> None:
+        self.failed[send.kind] += 1
+        _sends.inc(kind=KIND_NAMES[send.kind], result="failed")
+        if self.logger is not None:
+            self.logger.debug(f"Discord {KIND_NAMES[send.kind]} failed: {error}")
+
+    def _connection_lost(self, send: ScheduledSend, error: Exception) -> None:
+        """The send failed because the pipe is gone, try to reconnect in a while."""
+        self.failed[send.kind] += 1
+        _sends.inc(kind=KIND_NAMES[send.kind], result="failed")
+        _connected.set(0)
+        was_connected = self.supervisor.connected
+        delay = self.supervisor.connection_lost(error, lost_send=send.kind not in RESENDS)
+        if was_connected:
+            self.schedule(RECONNECT, lambda: None, delay=delay)
+
+    def _reconnect_done(self, error: Optional[Exception]) -> None:
+        if error is not None:
+            self.schedule(
+                RECONNECT, lambda: None, delay=self.supervisor.reconnect_failed(error)
+            )
+            return
+        self.supervisor.reconnected()
+        _connected.set(1)
+        if self.on_reconnect is not None:
+            self.on_reconnect()
+
+    def _reschedule(self, send: ScheduledSend) -> None:
+        if send.repeat is None:
+            return
+        delay = send.repeat() if callable(send.repeat) else send.repeat
+        with self._guard():
+            if send.cancelled or self._stopped:
+                return
+            if delay is None:
+                self._pending[send.kind].remove(send)
+                return
+            send.due = time.monotonic() + delay
+            send.seq = next(self._seq)
+            self._push(send, track=False)
+
+    def _lost(self, send: ScheduledSend) -> bool:
+        """Whether send can't be made because Discord is gone, counting it as lost if so."""
+        if self.supervisor.connected:
+            return False
+        _sends.inc(kind=KIND_NAMES[send.kind], result="lost")
+        if send.kind not in RESENDS:
+            self.supervisor.lost_sends += 1
+        return True
+
+    def _prepare(self, send: ScheduledSend) -> Optional[dict[str, Any]]:
+        """What to send for a send that just became due, None if nothing can be sent now."""
+        if (activity := send.action()) is None:
+            return None
+        if self._lost(send):
+            return None
+        with self._guard():
+            return activity if self._admit(send, activity) else None
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                send, activity, timeout = self._take_work()
+                while send is None and not self._stopped:
+                    self._condition.wait(timeout)
+                    send, activity, timeout = self._take_work()
+                if self._stopped or send is None:
+                    return
+
+            if send.kind == RECONNECT:
+                self._reconnect_done(self._reconnect())
+                continue
+
+            # A send that was held back already had its turn, and was rescheduled back then.
+            due_now = activity is None
+            if not due_now and self._lost(send):
+                # Discord went away while the send was held back.
+                activity = None
+            try:
+                if due_now:
+                    activity = self._prepare(send)
+                if activity is CLEAR:
+                    self.rpc.clear()  # type:ignore
+                    self._sent(send, activity)
+                elif activity is not None:
+                    self.rpc.update(**activity)  # type:ignore
+                    self._sent(send, activity)
+            except PIPE_ERRORS as e:
+                self._connection_lost(send, e)
+            except Exception as e:
+                self._failed(send, e)
+            if due_now:
+                self._reschedule(send)
+
+    def _reconnect(self) -> Optional[Exception]:
+        """Make a new connection with the same Presence, return the error if that failed."""
+        rpc: Presence = self.rpc  # type:ignore
+        try:
+            # The old pipe is dead, and Presence.connect() gets a loop of its own.
+            if rpc.sock_writer is not None:
+                rpc.sock_writer.close()
+            rpc.loop.close()
+        except Exception:
+            pass
+        try:
+            rpc.connect()
+        except Exception as e:
+            return e
+        return None
+
+    def __str__(self) -> str:
+        sent = " ".join(
+            f"{KIND_NAMES[kind]}={count}"
+            for kind, count in self.sent.items()
+            if kind != RECONNECT
+        )
+        return (
+            f"sent: {sent}, failed={sum(self.failed.values())} cancelled={self.cancelled} "
+            f"throttled={self.throttled} dropped={self.dropped}, limiter: {self.limiter}, "
+            f"connection: {self.supervisor}"
+        )
+
+
+class AsyncPresenceDispatcher(PresenceDispatcher):
+    """The same queue, run as a coroutine around an AioPresence, on an event loop of its own.
+
+    The queue is only ever touched from that loop: schedule() and cancel() hand their work over
+    with call_soon_threadsafe, and an asyncio.Event wakes the coroutine up. Sends, clears and
+    reconnects are all awaited on the same loop, so neither the queue nor the connection is locked.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        logger: Optional[RichLogger] = None,
+        limiter: Optional[TokenBucket] = None,
+    ) -> None:
+        super().__init__(logger, limiter)
+        self.client_id = client_id
+        self.rpc: Optional[AioPresence] = None  # type:ignore[assignment]
+
+        self._loop = asyncio.new_event_loop()
+        self._wakeup = asyncio.Event()
+        self._task: Optional["asyncio.Future[None]"] = None
+
+    def connect(self, logger: Optional[RichLogger] = None, timeout: float = 30) -> None:
+        """Start the event loop, connect to Discord on it, and start sending.
+        Raises the pypresence exception if connecting failed.
+        """
+        self.logger = self.supervisor.logger = logger or self.logger
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="presence-dispatcher", daemon=True
+            )
+            self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._connect(), self._loop).result(timeout)
+        _connected.set(1)
+        self._task = asyncio.run_coroutine_threadsafe(self._run_async(), self._loop)
+
+    def attach(self, rpc: Presence, logger: Optional[RichLogger] = None) -> None:
+        raise TypeError("AsyncPresenceDispatcher makes its own connection, use connect()")
+
+    def schedule(
+        self,
+        kind: int,
+        action: Callable[[], Activity],
+        delay: float = 0.0,
+        repeat: Repeat = None,
+        cancel: tuple[int, ...] = (),
+        on_sent: Optional[Callable[[dict[str, Any]], None]] = None,
+    ) -> ScheduledSend:
+        send = ScheduledSend(
+            due=time.monotonic() + delay,
+            kind=kind,
+            action=action,
+            repeat=repeat,
+            on_sent=on_sent,
+            seq=next(self._seq),
+        )
+        self._on_loop(self._enqueue, send, cancel)
+        return send
+
+    def cancel(self, *kinds: int) -> None:
+        self._on_loop(self._cancel_kinds, kinds)
+
+    def close(self, timeout: float = 5) -> None:
+        """Drop everything still pending, then clear the presence and stop the event loop."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = True
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout)
+        except Exception:
+            # Best-effort cleanup on the way out, see PresenceDispatcher.close.
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+    def _on_loop(self, callback: Callable[..., None], *args: Any) -> None:
+        """Run callback on the event loop: right away from the loop itself, queued otherwise."""
+        if threading.current_thread() is self._thread:
+            callback(*args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def _guard(self) -> ContextManager[Any]:
+        # Everything touching the queue already runs on the loop.
+        return contextlib.nullcontext()
+
+    def _wake(self) -> None:
+        self._wakeup.set()
+
+    async def _connect(self) -> None:
+        if self.rpc is None:
+            # AioPresence binds itself to the running loop, so it's created here.
+            self.rpc = AioPresence(self.client_id, loop=self._loop)
+        await self.rpc.connect()
+
+    async def _reconnect_async(self) -> Optional[Exception]:
+        """Make a new connection with the same AioPresence, return the error if that failed."""
+        try:
+            if self.rpc is not None and self.rpc.sock_writer is not None:
+                self.rpc.sock_writer.close()
+        except Exception:
+            pass
+        try:
+            await self._connect()
+        except Exception as e:
+            return e
+        return None
+
+    async def _close(self) -> None:
+        self._cancel_kinds(tuple(KIND_NAMES))
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+        if self.rpc is None or self.rpc.sock_writer is None:
+            return
+        try:
+            await self.rpc.clear()
+        except Exception:
+            pass
+        # AioPresence.close() would also close the loop it runs on, which is this one.
+        self.rpc.send_data(2, {"v": 1, "client_id": self.client_id})
+        self.rpc.sock_writer.close()
+
+    async def _send(self, activity: dict[str, Any]) -> None:
+        if activity is CLEAR:
+            await self.rpc.clear()  # type:ignore
+        else:
+            await self.rpc.update(**activity)  # type:ignore
+
+    async def _run_async(self) -> None:
+        while not self._stopped:
+            send, activity, timeout = self._take_work()
+            if send is None:
+                # Nothing ran on the loop since _take_work, so no wakeup can be missed here.
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if send.kind == RECONNECT:
+                self._reconnect_done(await self._reconnect_async())
+                continue
+
+            due_now = activity is None
+            if not due_now and self._lost(send):
+                # Discord went away while the send was held back.
+                activity = None
+            try:
+                if due_now:
+                    activity = self._prepare(send)
+                if activity is not None:
+                    await self._send(activity)
+                    self._sent(send, activity)
+            except PIPE_ERRORS as e:
+                self._connection_lost(send, e)
+            except Exception as e:
+                self._failed(send, e)
+            if due_now:
+                self._reschedule(send)
@@ -0,0 +1,83 @@
+"""
+Caches the locale (en_US, ko_KR, ...) the League client was started with.
+
+The locale is read once from the --locale= argument of the LeagueClient process, and stays valid
+for as long as that process (same PID and creation time) is alive. Once connected to the LCU, the
+locale reported by /riotclient/region-locale is used instead, without looking at processes at all.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import psutil
+
+from league_rpc import metrics
+
+LEAGUE_CLIENT_PROCESSES = ["LeagueClient.exe", "LeagueClientUx.exe"]
+DEFAULT_LOCALE = "en_US"
+
+# When no League process could be found, wait this long before scanning the processes again.
+RETRY_SCAN_SECONDS = 30
+
+
+class LocaleProvider:
+    """Returns the game locale, scanning the processes only when the League client changed."""
+
+    def __init__(self, league_processes: Optional[list[str]] = None) -> None:
+        self.league_processes = league_processes or LEAGUE_CLIENT_PROCESSES
+        self.scans = 0
+
+        self._locale: Optional[str] = None
+        self._lcu_locale: Optional[str] = None
+        self._pid: Optional[int] = None
+        self._create_time: float = 0.0
+        self._scanned_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        """Return the locale of the running League client, en_US if it can't be found."""
+        with self._lock:
+            if self._lcu_locale:
+                return self._lcu_locale
+            if not self._scanned_at or not self._is_valid():
+                self._scan()
+            return self._locale or DEFAULT_LOCALE
+
+    def set_lcu_locale(self, locale: Optional[str]) -> None:
+        """Use the locale reported by the LCU, or stop using it (None), e.g. after disconnecting."""
+        with self._lock:
+            self._lcu_locale = locale or None
+
+    def _is_valid(self) -> bool:
+        if self._pid is None:
+            # Nothing was found last time, only look again every RETRY_SCAN_SECONDS.
+            return time.monotonic() - self._scanned_at < RETRY_SCAN_SECONDS
+        try:
+            # Comparing the creation time guards against the PID being reused by another process.
+            return psutil.Process(self._pid).create_time() == self._create_time
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return False
+
+    def _scan(self) -> None:
+        self.scans += 1
+        self._scanned_at = time.monotonic()
+        self._locale, self._pid, self._create_time = None, None, 0.0
+
+        with metrics.process_scan_seconds.time(scanner="locale"):
+            # Only the name is read for every process, the cmdline only for League's.
+            for proc in psutil.process_iter(attrs=["name"]):
+                try:
+                    if proc.info["name"] not in self.league_processes:
+                        continue
+                    for argument in proc.cmdline():
+                        if argument.startswith("--locale="):
+                            self._locale = argument.split("=")[1]
+                            self._pid = proc.pid
+                            self._create_time = proc.create_time()
+                            return
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+
+
+locale_provider = LocaleProvider()
@@ -1,37 +1,268 @@
 """Module that contains functions to check for running processes."""
 
 import sys
+import threading
 import time
 from argparse import Namespace
 from datetime import datetime
+from typing import Any, Callable, Optional
 
 import psutil
 import pypresence  # type:ignore
 
+from league_rpc import metrics
 from league_rpc.logger.richlogger import RichLogger
 from league_rpc.utils.color import Color
 from league_rpc.utils.launch_league import launch_league_client
 
+try:
+    # Optional, Windows only: notifies about process creation, see ProcessWaiter.
+    import wmi  # type:ignore
+except ImportError:
+    wmi = None
+
+
+# How long a process table snapshot is reused before the processes are scanned again.
+PROCESS_TABLE_TTL_SECONDS = 1.0
+
+
+class ProcessTable:
+    """
+    A snapshot of the names of every running process, indexed in lowercase.
+
+    The whole system is scanned once (reading only the process names) and the snapshot answers
+    any number of queries for PROCESS_TABLE_TTL_SECONDS, so checking several names, or checking
+    again right after, doesn't walk the process list every time.
+    """
+
+    def __init__(self, ttl_seconds: float = PROCESS_TABLE_TTL_SECONDS) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.scans = 0
+        self._names: frozenset[str] = frozenset()
+        self._pids: dict[str, list[int]] = {}
+        self._scanned_at: float | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> frozenset[str]:
+        """Scan the running processes now."""
+        pids: dict[str, list[int]] = {}
+        with metrics.process_scan_seconds.time(scanner="process_table"):
+            for proc in psutil.process_iter(attrs=["name"]):
+                if name := proc.info["name"]:
+                    pids.setdefault(name.lower(), []).append(proc.pid)
+
+        with self._lock:
+            self.scans += 1
+            self._names = frozenset(pids)
+            self._pids = pids
+            self._scanned_at = time.monotonic()
+            return self._names
+
+    def names(self) -> frozenset[str]:
+        """Return the lowercase names of the running processes, scanning only if the snapshot expired."""
+        with self._lock:
+            if (
+                self._scanned_at is not None
+                and time.monotonic() - self._scanned_at < self.ttl_seconds
+            ):
+                return self._names
+        return self.refresh()
+
+    def __contains__(self, process_name: str) -> bool:
+        """Exact (case-insensitive) match on the process name."""
+        return process_name.lower() in self.names()
+
+    def matches(self, process_name: str) -> bool:
+        """Checks if process_name is part of any running process name (case-insensitive)."""
+        process_name = process_name.lower()
+        names = self.names()
+        return process_name in names or any(process_name in name for name in names)
+
+    def any_matches(self, process_names: list[str]) -> bool:
+        """Like matches, for several names at once, from the same snapshot."""
+        return any(self.matches(process_name) for process_name in process_names)
+
+    def pids(self, process_names: list[str]) -> list[int]:
+        """Return the PIDs of the processes whose name contains any of process_names."""
+        queries = [process_name.lower() for process_name in process_names]
+        names = self.names()
+        with self._lock:
+            return [
+                pid
+                for name in names
+                if any(query in name for query in queries)
+                for pid in self._pids.get(name, [])
+            ]
+
+
+process_table = ProcessTable()
+
+
+class ProcessTracker:
+    """
+    Tracks whether a program (e.g. the League client) is still running, by PID.
+
+    The PIDs found by name are pinned together with their creation time. Checking them again is
+    a pid_exists and a create_time call per PID, the creation time guards against a PID that was
+    reused by another process. Only when every pinned PID is gone, the process table is scanned
+    again to look for a new instance.
+    """
+
+    def __init__(
+        self, process_names: list[str], table: ProcessTable = process_table
+    ) -> None:
+        self.process_names = process_names
+        self.table = table
+        self.scans = 0
+        self._pinned: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_alive(pid: int, create_time: float) -> bool:
+        try:
+            return (
+                psutil.pid_exists(pid)
+                and psutil.Process(pid).create_time() == create_time
+            )
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return False
+
+    def _pin(self) -> None:
+        self.scans += 1
+        self._pinned = {}
+        for pid in self.table.pids(self.process_names):
+            try:
+                self._pinned[pid] = psutil.Process(pid).create_time()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+    def is_running(self) -> bool:
+        """Checks if any of the pinned processes, or else any process with a matching name, is running."""
+        with self._lock:
+            self._pinned = {
+                pid: create_time
+                for pid, create_time in self._pinned.items()
+                if self._is_alive(pid, create_time)
+            }
+            if not self._pinned:
+                self._pin()
+            return bool(self._pinned)
+
+
+class ProcessWaiter:
+    """
+    Blocks until one of the given process names is running, or the timeout passes.
+
+    The process table is checked with an exponential backoff, up to max_delay. On Windows, if
+    the optional `wmi` package is installed, the waiter also listens for process creation
+    events, so a new process is noticed right away instead of at the next poll.
+    """
+
+    def __init__(
+        self,
+        table: ProcessTable = process_table,
+        initial_delay: float = 0.25,
+        max_delay: float = 5.0,
+        backoff_factor: float = 2.0,
+        logger: Optional[RichLogger] = None,
+    ) -> None:
+        self.table = table
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.logger = logger
+
+    def _creation_watcher(self) -> Optional[Callable[..., Any]]:
+        """Return a WMI process creation watcher, or None if notifications aren't available."""
+        if wmi is None:
+            return None
+        try:
+            return wmi.WMI().Win32_Process.watch_for("creation")
+        except Exception:
+            # WMI can be disabled or broken, polling still works.
+            return None
+
+    def wait_for_any(
+        self, process_names: list[str], timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Wait until any of process_names is running (substring match, like processes_exists).
+        timeout=None waits forever. Returns False if the timeout passed first.
+        """
+        started = time.monotonic()
+        cpu_started = time.thread_time()
+        delay = self.initial_delay
+        polls = 0
+        watcher = None
+
+        try:
+            while True:
+                polls += 1
+                if polls > 1:
+                    # The snapshot may be younger than its TTL, but it predates the wait.
+                    self.table.refresh()
+                if self.table.any_matches(process_names):
+                    return True
+
+                remaining = (
+                    None if timeout is None else timeout - (time.monotonic() - started)
+                )
+                if remaining is not None and remaining <= 0:
+                    return False
+
+                sleep_for = delay if remaining is None else min(delay, remaining)
+                if watcher is None and polls == 2:
+                    # Only set up the watcher once the process wasn't there right away.
+                    watcher = self._creation_watcher() or False
+                if watcher:
+                    watcher = self._wait_for_creation(watcher, sleep_for)
+                else:
+                    time.sleep(sleep_for)
+                delay = min(delay * self.backoff_factor, self.max_delay)
+        finally:
+            if self.logger is not None:
+                self.logger.debug(
+                    f"Waited {time.monotonic() - started:.1f}s for {process_names}: "
+                    f"{polls} polls, {(time.thread_time() - cpu_started) * 1000:.1f}ms CPU"
+                    f"{', with process start notifications' if watcher else ''}"
+                )
+
+    def _wait_for_creation(
+        self, watcher: Callable[..., Any], timeout: float
+    ) -> Callable[..., Any] | bool:
+        """
+        Return as soon as any process starts, or after timeout seconds.
+        Returns the watcher, or False if it broke and polling has to take over.
+        """
+        started = time.monotonic()
+        try:
+            watcher(timeout_ms=max(int(timeout * 1000), 1))
+        except wmi.x_wmi_timed_out:  # type:ignore
+            # Nothing started in the meantime.
+            pass
+        except Exception:
+            # Sleep out the rest of the delay, and don't use the watcher anymore.
+            time.sleep(max(timeout - (time.monotonic() - started), 0))
+            return False
+        return watcher
+
+
+league_client_tracker = ProcessTracker(["LeagueClient.exe", "LeagueClientUx.exe"])
+
 
 def processes_exists(process_names: list[str]) -> bool:
     """
     Given an array of process names.
     Give a boolean return value if any of the names was a running process in the machine.
     """
-    return any(process_exists(process_name) for process_name in process_names)
+    return process_table.any_matches(process_names)
 
 
 def process_exists(process_name: str) -> bool:
     """
     Checks if the given process name is running or not.
     """
-    for proc in psutil.process_iter():
-        try:
-            if process_name.lower() in proc.name().lower():
-                return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-    return False
+    return process_table.matches(process_name)
 
 
 def check_league_client_process(cli_args: Namespace, logger: RichLogger) -> None:
@@ -46,7 +277,7 @@ def check_league_client_process(cli_args: Namespace, logger: RichLogger) -> None
 
     if cli_args.launch_league:
         # launch league if it's not already running.
-        if not processes_exists(league_processes):
+        if not process_table.any_matches(league_processes):
             launch_league_client(cli_args)
 
         time.sleep(0.5)
@@ -72,7 +303,7 @@ def check_league_client_process(cli_args: Namespace, logger: RichLogger) -> None
             ],
         )
 
-    if not processes_exists(process_names=league_processes):
+    if not process_table.any_matches(league_processes):
         # If league process is still not running, even after launching the client.
         # Then something must have gone wrong.
         # Do not exit app, but rather wait for user to open the correct game..
@@ -89,32 +320,30 @@ def check_league_client_process(cli_args: Namespace, logger: RichLogger) -> None
                 ],
             )
 
-    wait_time = 0
-    while not processes_exists(process_names=league_processes):
-        if cli_args.wait_for_league == -1:
-            continue
-        elif wait_time >= cli_args.wait_for_league:
-            logger.error(
-                f"League Client is not running! Exiting after waiting {cli_args.wait_for_league} seconds."
+        elif cli_args.wait_for_league > 0:
+            logger.info(
+                f"Will wait for League to start. Time left: {cli_args.wait_for_league} seconds...",
+                color="yellow",
             )
 
-            if not cli_args.wait_for_league:
-                logger.info(
-                    "Want to add waiting time for League? Use --wait-for-league <seconds>. (-1 = infinite, or until CTRL + C)",
-                    color="green",
-                )
+    if not ProcessWaiter(logger=logger).wait_for_any(
+        league_processes,
+        timeout=None if cli_args.wait_for_league == -1 else cli_args.wait_for_league,
+    ):
+        logger.error(
+            f"League Client is not running! Exiting after waiting {cli_args.wait_for_league} seconds."
+        )
 
-            sys.exit()
-        else:
+        if not cli_args.wait_for_league:
             logger.info(
-                f"Will wait for League to start. Time left: {cli_args.wait_for_league - wait_time} seconds...",
-                color="yellow",
+                "Want to add waiting time for League? Use --wait-for-league <seconds>. (-1 = infinite, or until CTRL + C)",
+                color="green",
             )
 
-            time.sleep(5)
-            wait_time += 5
-            continue
-        break
+        sys.exit()
+
+    # Pin the client's PIDs now, so later checks don't have to scan for them.
+    league_client_tracker.is_running()
 
     logger.info("League client is running!", color="green")
     logger.update_progress_bar(advance=50)
@@ -134,7 +363,7 @@ def check_discord_process(
     time.sleep(1)
     logger.update_progress_bar(advance=20)
 
-    if not processes_exists(process_names=process_names):
+    if not process_table.any_matches(process_names):
         if wait_for_discord == -1:
             logger.warning(
                 "Will wait indefinitely for Discord to start... Remember, forever is a long time.. use CTRL + C if you would like to quit.",
@@ -147,37 +376,30 @@ def check_discord_process(
                 ],
             )
 
-    wait_time = 0
-    while True:
-        if not processes_exists(process_names=process_names):
-            if wait_for_discord == -1:
-                time.sleep(3)
-                continue
-            elif wait_time >= wait_for_discord:
-                logger.error(
-                    f"Discord not running! Could not find any process with the names {look_for_processes} running on your system."
-                )
-                logger.info(
-                    "Is your Discord process named something else? Try --add-process <name>"
-                )
+        elif wait_for_discord > 0:
+            logger.info(
+                f"Will wait for Discord to start. Time left: {wait_for_discord} seconds...",
+                color="yellow",
+            )
 
-                if not wait_for_discord:
-                    logger.info(
-                        "Want to add waiting time for discord? Use --wait-for-discord <seconds>. (-1 = infinite, or until CTRL + C)",
-                        color="green",
-                    )
-
-                sys.exit()
-            else:
-                logger.info(
-                    f"Will wait for Discord to start. Time left: {wait_for_discord - wait_time} seconds...",
-                    color="yellow",
-                )
+    if not ProcessWaiter(logger=logger).wait_for_any(
+        process_names,
+        timeout=None if wait_for_discord == -1 else wait_for_discord,
+    ):
+        logger.error(
+            f"Discord not running! Could not find any process with the names {look_for_processes} running on your system."
+        )
+        logger.info(
+            "Is your Discord process named something else? Try --add-process <name>"
+        )
 
-                time.sleep(5)
-                wait_time += 5
-                continue
-        break
+        if not wait_for_discord:
+            logger.info(
+                "Want to add waiting time for discord? Use --wait-for-discord <seconds>. (-1 = infinite, or until CTRL + C)",
+                color="green",
+            )
+
+        sys.exit()
 
     logger.info("Discord is running!", color="green")
     logger.update_progress_bar(advance=50)
@@ -235,8 +457,9 @@ def player_state() -> str | None:
     """
     current_state: str | None = None
 
-    if processes_exists(process_names=["LeagueClient.exe", "LeagueClientUx.exe"]):
-        if process_exists(process_name="League of Legends.exe"):
+    # Both checks are answered from a single scan of the processes.
+    if process_table.any_matches(["LeagueClient.exe", "LeagueClientUx.exe"]):
+        if process_table.matches("League of Legends.exe"):
             current_state = "InGame"
         else:
             current_state = "InLobby"
@@ -1,45 +1,99 @@
 """
-Holds functions to try to reconnect to discord whenever the pipe closes or discord suddenly crashes.
+Keeps track of the IPC connection to Discord, and of when to try to reconnect after it broke.
+
+The presence dispatcher reports the first send that fails because the pipe is gone (Discord was
+closed, restarted or crashed). From then on, sends are skipped instead of being attempted, and the
+ones carrying a new activity (not the resends of the last one) are counted as lost. Reconnects are
+tried after a jittered, exponentially growing delay. Once Discord is back, the dispatcher replays
+the last activity, and the supervisor records how long the outage lasted.
 """
 
-import sys
+import random
 import time
+from typing import Optional
 
-import pypresence
+from league_rpc.logger.richlogger import RichLogger
 
-from league_rpc.utils.color import Color
 
+class DiscordSupervisor:
+    """State of the Discord connection: up or down, the reconnect backoff, and outage numbers."""
 
-def discord_reconnect_attempt(
-    rpc: pypresence.Presence,
-    amount_of_tries: int = 12,
-    amount_of_waiting: int = 5,
-):
-    """
-    Attempts to connect to discord, over a period of time. If it still fails, it will exit the program.
-    """
-    for i in range(amount_of_tries):
-        try:
-            time.sleep(amount_of_waiting)
-            print(
-                f"{Color.yellow}({i + 1}/{amount_of_tries}). Attempting to reconnect..{Color.reset}"
-            )
-            rpc.connect()
-            print(
-                f"{Color.green}Successfully reconnected.. Proceeding as normal.{Color.reset}"
+    def __init__(
+        self,
+        initial_delay: float = 1,
+        max_delay: float = 60,
+        backoff_factor: float = 2,
+        jitter: float = 0.25,
+        logger: Optional[RichLogger] = None,
+    ) -> None:
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter  # Every delay is randomly moved by up to this fraction.
+        self.logger = logger
+
+        self.connected = True
+        self.outages = 0
+        self.lost_sends = 0  # Sends that couldn't be made while Discord was gone.
+        self.reconnect_attempts = 0
+        self.last_outage_seconds = 0.0
+        self.total_outage_seconds = 0.0
+
+        self._attempt = 0
+        self._down_since = 0.0
+
+    @property
+    def outage_seconds(self) -> float:
+        """How long the current outage has lasted, 0 while connected."""
+        return 0.0 if self.connected else time.monotonic() - self._down_since
+
+    def connection_lost(self, error: Exception, lost_send: bool = True) -> float:
+        """Record that the pipe broke, and return the delay before the first reconnect.
+        lost_send tells whether the send that failed counts as lost (resends don't).
+        """
+        if lost_send:
+            self.lost_sends += 1
+        if not self.connected:
+            return self.next_delay()
+
+        self.connected = False
+        self.outages += 1
+        self._attempt = 0
+        self._down_since = time.monotonic()
+        if self.logger is not None:
+            self.logger.warning(f"Lost the connection to Discord ({error!r}), reconnecting..")
+        return self.next_delay()
+
+    def next_delay(self) -> float:
+        """The delay before the next reconnect attempt."""
+        delay = min(self.initial_delay * self.backoff_factor**self._attempt, self.max_delay)
+        self._attempt += 1
+        # Spread the attempts, so they don't hit Discord in lockstep while it's starting up.
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def reconnect_failed(self, error: Exception) -> float:
+        """Record a failed attempt, and return the delay before the next one."""
+        self.reconnect_attempts += 1
+        if self.logger is not None:
+            self.logger.debug(f"Reconnecting to Discord failed: {error!r}")
+        return self.next_delay()
+
+    def reconnected(self) -> None:
+        """Record that the connection is back."""
+        self.reconnect_attempts += 1
+        self.last_outage_seconds = self.outage_seconds
+        self.total_outage_seconds += self.last_outage_seconds
+        self.connected = True
+        if self.logger is not None:
+            self.logger.info(
+                f"Reconnected to Discord after {self.last_outage_seconds:.1f}s, "
+                f"{self.lost_sends} update(s) lost so far.",
+                color="green",
             )
-            break
-
-        except (
-            pypresence.exceptions.DiscordNotFound,
-            pypresence.exceptions.DiscordError,
-            pypresence.exceptions.InvalidPipe,
-            pypresence.exceptions.PipeClosed,
-            ConnectionError,
-        ):
-            pass
-    else:
-        print(
-            f"{Color.red}Was unable to reconnect to Discord. after trying for {amount_of_tries * amount_of_waiting} seconds.{Color.reset}"
+
+    def __str__(self) -> str:
+        return (
+            f"connected={self.connected} outages={self.outages} lost_sends={self.lost_sends} "
+            f"attempts={self.reconnect_attempts} last_outage={self.last_outage_seconds:.1f}s "
+            f"total_outage={self.total_outage_seconds:.1f}s"
         )
-        sys.exit()
@@ -0,0 +1,122 @@
+"""
+Per-champion lookup index from the game's skinID to its base skin, chroma and display name.
+
+The index is built from the DDragon champion data and the Meraki chroma data the first time a
+champion is seen, so resolving a skinID afterwards is a dict lookup, with a bisect over the sorted
+skin numbers as the "highest base skin <= skinID" fallback, instead of nested scans over every
+skin and chroma on each tick.
+"""
+
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+def _is_base_skin_name(name: str) -> bool:
+    """DDragon names chromas "Skin Name (Color)", base skins never have a parenthetical suffix."""
+    return name == "default" or "(" not in name
+
+
+@dataclass
+class SkinIndex:
+    """skinID lookups for a single champion."""
+
+    # skinID -> (base skin number, chroma name or None, display name of the base skin or None)
+    entries: dict[int, tuple[int, Optional[str], Optional[str]]] = field(
+        default_factory=dict
+    )
+    # DDragon skin number -> DDragon name, first entry wins like the linear scans did.
+    names: dict[int, str] = field(default_factory=dict)
+    # Sorted numbers of every DDragon skin entry, and of the ones that are base skins.
+    skin_nums: list[int] = field(default_factory=list)
+    base_skin_nums: list[int] = field(default_factory=list)
+
+    @classmethod
+    def build(
+        cls,
+        raw_champion_name: str,
+        ddragon_champion_data: dict[str, Any],
+        chroma_data: Optional[dict[str, Any]],
+    ) -> "SkinIndex":
+        """Build the index for raw_champion_name."""
+        index = cls()
+
+        for skin in ddragon_champion_data["data"][raw_champion_name]["skins"]:
+            index.names.setdefault(skin["num"], skin.get("name", ""))
+
+        index.skin_nums = sorted(index.names)
+        index.base_skin_nums = [
+            num for num in index.skin_nums if _is_base_skin_name(index.names[num])
+        ]
+
+        for num in index.base_skin_nums:
+            index.entries[num] = (num, None, index.display_name(num))
+
+        # Meraki explicitly separates base skins from their chromas. DDragon also lists chromas as
+        # skins with their own num, so Meraki takes precedence for any skinID it knows as a chroma.
+        chromas: dict[int, tuple[int, Optional[str], Optional[str]]] = {}
+        for meraki_skin in (chroma_data or {}).get("skins") or []:
+            # Meraki IDs are like 36003; last 3 digits are the base skin num
+            base_skin_num = meraki_skin["id"] % 1000
+            for chroma in meraki_skin.get("chromas") or []:
+                if chroma is None:
+                    continue
+                # Meraki chroma IDs match the game's skinID value
+                chromas.setdefault(
+                    chroma["id"] % 1000,
+                    (base_skin_num, chroma["name"], index.display_name(base_skin_num)),
+                )
+        index.entries.update(chromas)
+        return index
+
+    def display_name(self, skin_num: int) -> Optional[str]:
+        """Return the DDragon name of the skin, None for the default skin or if it is unknown."""
+        name = self.names.get(skin_num)
+        return None if name in (None, "default") else name
+
+    def base_skin_and_chroma(self, skin_id: int) -> tuple[int, Optional[str]]:
+        """Return (base skin number, chroma name or None) for the skinID."""
+        if entry := self.entries.get(skin_id):
+            return entry[0], entry[1]
+
+        # Unknown skinID: the highest base skin number below it.
+        position = bisect_right(self.base_skin_nums, skin_id)
+        return (self.base_skin_nums[position - 1], None) if position else (0, None)
+
+    def base_skin_id(self, skin_id: int) -> int:
+        """Return skin_id if DDragon lists it, otherwise the highest listed number below it."""
+        if skin_id in self.names:
+            return skin_id
+
+        position = bisect_right(self.skin_nums, skin_id)
+        return self.skin_nums[position - 1] if position else 0
+
+
+_indexes: dict[tuple[Any, ...], SkinIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_skin_index(
+    raw_champion_name: str,
+    ddragon_champion_data: dict[str, Any],
+    chroma_data: Optional[dict[str, Any]] = None,
+) -> SkinIndex:
+    """Return the index for the champion, building it the first time it is seen."""
+    champion: dict[str, Any] = ddragon_champion_data["data"][raw_champion_name]
+    # The title is localized, so it tells the DDragon locales apart.
+    key = (
+        raw_champion_name,
+        ddragon_champion_data.get("version"),
+        champion.get("title"),
+        chroma_data is not None,
+    )
+
+    with _indexes_lock:
+        if (index := _indexes.get(key)) is not None:
+            return index
+
+    index = SkinIndex.build(raw_champion_name, ddragon_champion_data, chroma_data)
+    with _indexes_lock:
+        _indexes[key] = index
+    return index
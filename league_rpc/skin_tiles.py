@@ -0,0 +1,107 @@
+"""
+Existence cache for the DDragon skin tiles (<champion>_<num>.jpg).
+
+Riot has no tile for a chroma, so get_skin_asset counts the skin number down until a tile exists.
+Each step used to be a HEAD request to DDragon, on every tick. This module remembers the outcome
+of every HEAD request (positive and negative) per DDragon version on disk, so a new patch
+re-validates the tiles, and remembers the final URL for a (champion, skin_id) pair in memory.
+"""
+
+import threading
+from http import HTTPStatus
+from typing import Optional
+
+import requests
+
+from league_rpc import metrics
+from league_rpc.latest_version import get_latest_version
+from league_rpc.utils.const import BASE_SKIN_URL
+from league_rpc.utils.disk_cache import DiskCache
+
+
+class SkinTileCache:
+    """Remembers which skin tiles exist, and which tile URL a skin resolves to."""
+
+    def __init__(self) -> None:
+        # One entry per version and champion: {"<num>": true/false}
+        self._disk_cache = DiskCache(namespace="skin-tiles", max_bytes=1024 * 1024)
+        self._known: dict[str, dict[str, bool]] = {}
+        self._resolved: dict[tuple[Optional[str], str, int], str] = {}
+        self._lock = threading.Lock()
+
+        # Hits/misses of the final URL lookup, and the HEAD requests the misses still needed.
+        self.hits = 0
+        self.misses = 0
+        self.head_requests = 0
+
+    @staticmethod
+    def _version() -> Optional[str]:
+        try:
+            return get_latest_version()
+        except RuntimeError:
+            # Unknown version, the tile checks are then only remembered for this session.
+            return None
+
+    def get_url(self, champion_name: str, skin_id: int) -> Optional[str]:
+        """Return the tile URL the skin resolved to earlier in this patch, if any."""
+        key = (self._version(), champion_name, skin_id)
+        with self._lock:
+            url = self._resolved.get(key)
+            if url is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return url
+
+    def set_url(self, champion_name: str, skin_id: int, url: str) -> None:
+        """Remember the tile URL the skin resolved to."""
+        with self._lock:
+            self._resolved[(self._version(), champion_name, skin_id)] = url
+
+    def tile_exists(self, champion_name: str, num: int) -> Optional[bool]:
+        """Return whether DDragon has the <champion>_<num>.jpg tile, asking it only once per patch.
+        None if DDragon couldn't tell, which isn't remembered.
+        """
+        version = self._version()
+        cache_key = f"{version}/{champion_name}"
+        with self._lock:
+            if cache_key not in self._known:
+                stored = self._disk_cache.get(cache_key) if version else None
+                self._known[cache_key] = dict(stored or {})
+            known = self._known[cache_key]
+            if str(num) in known:
+                return known[str(num)]
+
+        exists = self._head(f"{BASE_SKIN_URL}{champion_name}_{num}.jpg")
+        if exists is None:
+            return None
+
+        with self._lock:
+            known[str(num)] = exists
+            snapshot = dict(known)
+        if version is not None:
+            self._disk_cache.set(cache_key, snapshot)
+        return exists
+
+    def _head(self, url: str) -> Optional[bool]:
+        """True/False if DDragon says the tile exists or not, None if we couldn't tell."""
+        with self._lock:
+            self.head_requests += 1
+        try:
+            with metrics.http_request_seconds.time(source="ddragon_skin_tile"):
+                status = requests.head(url=url, timeout=15).status_code
+        except requests.RequestException:
+            # Offline or DDragon is unreachable, that says nothing about the tile either.
+            return None
+        if status == HTTPStatus.OK:
+            return True
+        if status in (HTTPStatus.FORBIDDEN, HTTPStatus.NOT_FOUND):
+            return False
+        # A server error says nothing about the tile, so don't remember it.
+        return None
+
+    def __str__(self) -> str:
+        return f"hits={self.hits} misses={self.misses} head_requests={self.head_requests}"
+
+
+skin_tile_cache = SkinTileCache()
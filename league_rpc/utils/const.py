@@ -14,13 +14,12 @@ SMALL_TEXT = f"its-haze/league-rpc @Github.com ({__version__})"
 
 PLACEHOLDER_ICON_ROTATE_INTERVAL_SECONDS = 5
 
-ALL_GAME_DATA_URL = "https://127.0.0.1:2999/liveclientdata/allgamedata"
+# How long the latest DDragon version is trusted before it's refreshed, see --version-ttl.
+DEFAULT_VERSION_TTL_SECONDS = 60 * 60
 
-ACTIVE_PLAYER_URL = "https://127.0.0.1:2999/liveclientdata/activeplayer"
+ALL_GAME_DATA_URL = "https://127.0.0.1:2999/liveclientdata/allgamedata"
 
-PLAYER_KDA_SCORES_URL = (
-    "https://127.0.0.1:2999/liveclientdata/playerscores?riotId={riotId}"
-)
+EVENT_DATA_URL = "https://127.0.0.1:2999/liveclientdata/eventdata?eventID={event_id}"
 
 BASE_SKIN_URL = "https://ddragon.leagueoflegends.com/cdn/img/champion/tiles/"
 
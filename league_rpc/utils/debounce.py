@@ -0,0 +1,72 @@
+"""
+Collapses bursts of calls into a single call, run on one worker thread.
+
+The first submit() opens a window of `delay` seconds. Every submit() that arrives before the window
+closes only replaces the call to make, so the last one wins and runs once. Calls never overlap: a
+submit() made while a call is running opens a new window, which is only served once that call
+returned.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from league_rpc.logger.richlogger import RichLogger
+
+
+class Debouncer:
+    """A single worker thread running at most one debounced call at a time."""
+
+    def __init__(
+        self, delay: float, name: str = "debouncer", logger: Optional[RichLogger] = None
+    ) -> None:
+        self.delay = delay
+        self.name = name
+        self.logger = logger
+
+        self.events = 0  # Calls submitted.
+        self.runs = 0  # Calls actually made.
+
+        self._condition = threading.Condition()
+        self._pending: Optional[tuple[Callable[..., Any], tuple[Any, ...]]] = None
+        self._deadline = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> None:
+        """Run function(*args) once the current window closes, replacing any call still waiting."""
+        with self._condition:
+            self.events += 1
+            if self._pending is None:
+                self._deadline = time.monotonic() + self.delay
+            self._pending = (function, args)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                while (remaining := self._deadline - time.monotonic()) > 0:
+                    self._condition.wait(remaining)
+                function, args = self._pending
+                self._pending = None
+                self.runs += 1
+
+            try:
+                function(*args)
+            except Exception as e:
+                # Keep the worker alive, the next submit() gets a fresh try.
+                if self.logger is not None:
+                    self.logger.debug(f"{self.name} call failed: {e}")
+
+    def __str__(self) -> str:
+        return (
+            f"events={self.events} runs={self.runs} "
+            f"coalesced={self.events - self.runs - (self._pending is not None)}"
+        )
@@ -0,0 +1,173 @@
+"""
+Persistent, size-capped cache for static game data (DDragon, Meraki, ...).
+
+Entries are stored by a hash of their key (e.g. "champion/14.10.1/en_US/Ahri"), not of their
+content: the JSON value is written to <cache dir>/<namespace>/<hash[:2]>/<hash>.json. Writes go to a
+temporary file first and are moved into place with os.replace, so a crash or a second instance of
+the app never leaves a half written entry behind.
+
+When the namespace grows over max_bytes, the least recently used entries are evicted. Reading an
+entry bumps its modification time, which is what the LRU order is based on. Recently used values
+are also kept parsed in memory, so repeated lookups don't touch the disk at all.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from league_rpc import metrics
+
+# Bump this when the layout of cached entries changes, old entries are then simply ignored.
+CACHE_FORMAT_VERSION = 1
+
+_lookups = metrics.counter(
+    "league_rpc_cache_lookups_total",
+    "Disk cache lookups, by namespace and result (memory_hit, disk_hit, miss).",
+    ["namespace", "result"],
+)
+
+
+def cache_dir() -> Path:
+    """Return the directory LeagueRPC stores its cache in."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        return Path(base) / "LeagueRPC" / "cache"
+
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "league-rpc"
+
+
+class DiskCache:
+    """A namespaced JSON cache on disk, one file per key hash, with an in-memory LRU layer in front of it."""
+
+    def __init__(
+        self,
+        namespace: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        memory_entries: int = 32,
+        root: Optional[Path] = None,
+    ) -> None:
+        self.namespace = namespace
+        self.directory = (root or cache_dir()) / f"{namespace}-v{CACHE_FORMAT_VERSION}"
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # Computed lazily on the first write.
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if it isn't cached."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                _lookups.inc(namespace=self.namespace, result="memory_hit")
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with path.open("r", encoding="utf-8") as file:
+                entry = json.load(file)
+            if entry.get("key") != key:
+                raise ValueError("Hash collision or foreign entry")
+            os.utime(path)  # Mark as recently used.
+        except (OSError, ValueError, AttributeError):
+            with self._lock:
+                self.misses += 1
+            _lookups.inc(namespace=self.namespace, result="miss")
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, entry["value"])
+        _lookups.inc(namespace=self.namespace, result="disk_hit")
+        return entry["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key. Failing to write to disk is not an error, the value is then only kept in memory."""
+        with self._lock:
+            self._remember(key, value)
+
+        path = self._path(key)
+        data = json.dumps({"key": key, "value": value}, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(data)
+                previous_size = path.stat().st_size if path.exists() else 0
+                os.replace(tmp_path, path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_size()
+            else:
+                self._size += len(data) - previous_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _disk_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the cache is at 90% of max_bytes."""
+        entries = sorted(self._entries())
+        size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= entry_size
+        self._size = size
+
+    def clear_memory(self) -> None:
+        """Drop the in-memory layer, the entries on disk are kept."""
+        with self._lock:
+            self._memory.clear()
+
+    def __str__(self) -> str:
+        return f"memory_hits={self.memory_hits} disk_hits={self.disk_hits} misses={self.misses}"
@@ -0,0 +1,54 @@
+"""
+Connection counters for the local League APIs.
+
+The Live Client Data API (127.0.0.1:2999) is polled all the time during a game, over the
+keep-alive aiohttp session of live_client_data. The counters in this module tell how many
+connections were opened and how many requests reused an already open connection.
+"""
+
+import threading
+from dataclasses import dataclass
+
+
+@dataclass
+class ConnectionStats:
+    """Connections opened vs. requests sent to a single host."""
+
+    opened: int = 0
+    requests: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requests that went over an already open (keep-alive) connection."""
+        return max(self.requests - self.opened, 0)
+
+
+_stats: dict[str, ConnectionStats] = {}
+_stats_lock = threading.Lock()
+
+
+def record_connection(host: str, port: int | None, opened: bool = False) -> None:
+    """Count a request to host:port, or a newly opened connection if opened is True."""
+    with _stats_lock:
+        stats = _stats.setdefault(f"{host}:{port}", ConnectionStats())
+        if opened:
+            stats.opened += 1
+        else:
+            stats.requests += 1
+
+
+def connection_stats() -> dict[str, ConnectionStats]:
+    """Return a copy of the connection counters, keyed by host:port."""
+    with _stats_lock:
+        return {
+            host: ConnectionStats(opened=stats.opened, requests=stats.requests)
+            for host, stats in _stats.items()
+        }
+
+
+def format_connection_stats() -> str:
+    """Return the connection counters as a single human readable line."""
+    return ", ".join(
+        f"{host} opened={stats.opened} reused={stats.reused}"
+        for host, stats in connection_stats().items()
+    )
@@ -0,0 +1,70 @@
+"""
+Measures how long the asyncio event loop was blocked.
+
+A small task sleeps for a fixed interval and checks how late it woke up. Anything beyond the
+interval is time during which the loop couldn't run anything else, e.g. because a handler called
+time.sleep or did blocking I/O. On the lcu_driver loop, that's time websocket events were stuck in
+the queue.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from league_rpc.logger.richlogger import RichLogger
+
+
+class LoopLagMonitor:
+    """Samples the lag of the running event loop, and logs every stall above stall_threshold."""
+
+    def __init__(
+        self,
+        interval: float = 0.25,
+        stall_threshold: float = 0.1,
+        logger: Optional[RichLogger] = None,
+    ) -> None:
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.logger = logger
+
+        self.samples = 0
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.blocked_seconds = 0.0  # Sum of the lag of every stall.
+
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self) -> None:
+        """Start sampling on the running event loop, if not already started."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        """Stop sampling. The collected numbers are kept."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(time.perf_counter() - expected, 0.0))
+
+    def record(self, lag: float) -> None:
+        """Record one lag sample, in seconds."""
+        self.samples += 1
+        self.max_lag = max(self.max_lag, lag)
+        if lag < self.stall_threshold:
+            return
+
+        self.stalls += 1
+        self.blocked_seconds += lag
+        if self.logger is not None:
+            self.logger.debug(f"Event loop was blocked for {lag * 1000:.0f}ms")
+
+    def __str__(self) -> str:
+        return (
+            f"blocked={self.blocked_seconds:.2f}s stalls={self.stalls} "
+            f"max_lag={self.max_lag * 1000:.0f}ms samples={self.samples}"
+        )
@@ -1,44 +1,37 @@
-import time
+class AdaptivePollScheduler:
+    """
+    Decides how long to wait between two polls of a live game.
 
-import requests
-from urllib3.exceptions import NewConnectionError
+    Every tick reports a signature of the values it displayed. When the signature changed since
+    the previous tick (teamfights, shopping, farming) the interval is halved, down to
+    min_interval. While it stays the same, the interval grows by backoff_factor, up to
+    max_interval. One scheduler is used per game, so ticks counts the polls of that game.
+    """
 
+    def __init__(
+        self,
+        min_interval: float = 2,
+        max_interval: float = 20,
+        initial_interval: float = 5,
+        backoff_factor: float = 1.5,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.interval: float = initial_interval
+        self.ticks: int = 0
+        self._last_signature: object = None
 
-def wait_until_exists(
-    url: str,
-    custom_message: str = "",
-    expected_response_code: int = 200,
-    timeout: int = 30,
-    n_sleep: float | int = 5,  # Not needed, but good to have.
-    n_total_amount: int = 20,
-    startup: int = False,  # Set to True on the first time it tries to poll the local api. (onGameStart)
-) -> requests.Response | None:
-    """
-    Polling on the local riot api until success is returned.
-    """
+    def observe(self, signature: object) -> float:
+        """Record the signature of the current tick and return the interval until the next one."""
+        if self.ticks and signature != self._last_signature:
+            self.interval = max(self.interval / 2, self.min_interval)
+        elif self.ticks:
+            self.interval = min(self.interval * self.backoff_factor, self.max_interval)
 
-    for _ in range(n_total_amount):
-        try:
-            response = requests.get(url, timeout=timeout, verify=False)
-            if response.status_code != expected_response_code:
-                time.sleep(n_sleep)
-                continue
-            break
-        except (
-            NewConnectionError,
-            ConnectionError,
-            requests.exceptions.ConnectionError,
-        ):
-            # These errors occur either before the api has started..
-            # Or when the game has ended
-            if startup:
-                # Make sure we continue to poll the api during the start of a game.
-                time.sleep(n_sleep)
-                continue
+        self.ticks += 1
+        self._last_signature = signature
+        return self.interval
 
-            # When game ends, we don't care about polling the api.
-            return None
-    else:
-        print(custom_message)
-        return None
-    return response
+    def __str__(self) -> str:
+        return f"ticks={self.ticks} interval={self.interval:.1f}s"
@@ -0,0 +1,51 @@
+"""
+A token bucket, to limit how often something may happen.
+
+The bucket holds up to `burst` tokens and gains `rate` tokens per second. Every allowed action takes
+one token, so at most `burst` actions can happen back to back, and `rate` per second on average.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket, starting full."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+
+        self.granted = 0
+        self.denied = 0
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if there is one. Never blocks."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.granted += 1
+                return True
+            self.denied += 1
+            return False
+
+    def delay(self) -> float:
+        """Seconds until a token is available, 0 if there is one now."""
+        with self._lock:
+            self._refill()
+            return max(1 - self._tokens, 0.0) / self.rate
+
+    def __str__(self) -> str:
+        return f"rate={self.rate:g}/s burst={self.burst} granted={self.granted} denied={self.denied}"
@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from league_rpc.utils.disk_cache import DiskCache
+
+
+def entry_files(cache: DiskCache) -> list[Path]:
+    return sorted(cache.directory.glob("*/*"))
+
+
+def test_values_survive_a_new_instance(tmp_path: Path) -> None:
+    DiskCache("test", root=tmp_path).set("champion/Ahri", {"title": "the Nine-Tailed Fox"})
+
+    cache = DiskCache("test", root=tmp_path)
+    assert cache.get("champion/Ahri") == {"title": "the Nine-Tailed Fox"}
+    assert cache.get("champion/Ahri") == {"title": "the Nine-Tailed Fox"}
+    assert (cache.disk_hits, cache.memory_hits, cache.misses) == (1, 1, 0)
+
+
+def test_missing_and_corrupt_entries_are_misses(tmp_path: Path) -> None:
+    cache = DiskCache("test", root=tmp_path)
+    assert cache.get("nothing") is None
+
+    cache.set("key", 1)
+    (path,) = entry_files(cache)
+    path.write_text("{not json", encoding="utf-8")
+    cache.clear_memory()
+    assert cache.get("key") is None
+    assert cache.misses == 2
+
+
+def test_writes_leave_no_temporary_files(tmp_path: Path) -> None:
+    cache = DiskCache("test", root=tmp_path)
+    for i in range(10):
+        cache.set("key", i)
+
+    (path,) = entry_files(cache)
+    assert path.suffix == ".json"
+
+
+def test_a_failed_write_keeps_the_previous_entry(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = DiskCache("test", root=tmp_path)
+    cache.set("key", "old")
+
+    def fail(*_: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    cache.set("key", "new")
+    monkeypatch.undo()
+
+    # The failed value is still served from memory, but never reached the disk.
+    assert cache.get("key") == "new"
+    assert DiskCache("test", root=tmp_path).get("key") == "old"
+    assert [path.suffix for path in entry_files(cache)] == [".json"]
+
+
+def test_eviction_removes_the_least_recently_used_entries(tmp_path: Path) -> None:
+    cache = DiskCache("test", root=tmp_path, max_bytes=1000)
+    value = "x" * 150
+    for i in range(5):
+        cache.set(f"key{i}", value)
+        # mtime is what the LRU order is based on, make it unambiguous.
+        os.utime(cache._path(f"key{i}"), (1000 + i, 1000 + i))
+
+    # Reading key0 from disk marks it as recently used.
+    cache.clear_memory()
+    assert cache.get("key0") == value
+
+    cache.set("key5", value)
+    cache.set("key6", value)
+
+    remaining = {
+        key for key in (f"key{i}" for i in range(7)) if cache._path(key).exists()
+    }
+    assert "key0" in remaining
+    assert "key1" not in remaining
+    assert {"key5", "key6"} <= remaining
+    assert sum(path.stat().st_size for path in entry_files(cache)) <= 1000
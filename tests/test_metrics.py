@@ -0,0 +1,119 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from league_rpc.metrics import MetricsRegistry, MetricsWriter
+
+
+def test_prometheus_text_format() -> None:
+    registry = MetricsRegistry()
+    lookups = registry.counter("lookups_total", "Cache lookups.", ["result"])
+    lookups.inc(result="hit")
+    lookups.inc(2, result="miss")
+    registry.gauge("connected", "Whether we're connected.").set(1)
+
+    text = registry.to_prometheus()
+    assert text == (
+        "# HELP connected Whether we're connected.\n"
+        "# TYPE connected gauge\n"
+        "connected 1\n"
+        "# HELP lookups_total Cache lookups.\n"
+        "# TYPE lookups_total counter\n"
+        'lookups_total{result="hit"} 1\n'
+        'lookups_total{result="miss"} 2\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = MetricsRegistry()
+    seconds = registry.histogram("request_seconds", "Requests.", ["source"], buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        seconds.observe(value, source="ddragon")
+
+    lines = registry.to_prometheus().splitlines()[2:]
+    assert lines == [
+        'request_seconds_bucket{source="ddragon",le="0.1"} 2',
+        'request_seconds_bucket{source="ddragon",le="1"} 3',
+        'request_seconds_bucket{source="ddragon",le="+Inf"} 4',
+        'request_seconds_sum{source="ddragon"} 3.65',
+        'request_seconds_count{source="ddragon"} 4',
+    ]
+
+
+def test_json_format() -> None:
+    registry = MetricsRegistry()
+    registry.counter("sends_total", "Sends.", ["kind"]).inc(kind="update")
+    registry.histogram("scan_seconds", "Scans.", buckets=(1,)).observe(0.5)
+
+    document = json.loads(registry.to_json())
+    assert document["metrics"] == {
+        "scan_seconds": {
+            "type": "histogram",
+            "help": "Scans.",
+            "samples": [
+                {"labels": {}, "buckets": {"1": 1, "+Inf": 0}, "sum": 0.5, "count": 1}
+            ],
+        },
+        "sends_total": {
+            "type": "counter",
+            "help": "Sends.",
+            "samples": [{"labels": {"kind": "update"}, "value": 1}],
+        },
+    }
+
+
+def test_creating_an_existing_metric_returns_it() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("sends_total", "Sends.")
+    assert registry.counter("sends_total", "Sends.") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("sends_total", "Sends.")
+
+
+def test_labels_must_match() -> None:
+    counter = MetricsRegistry().counter("sends_total", "Sends.", ["kind"])
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        counter.inc(kind="update", result="sent")
+
+
+def test_gauge_functions_are_read_on_render() -> None:
+    registry = MetricsRegistry()
+    age: Optional[float] = None
+    gauge = registry.gauge("cache_age_seconds", "Cache age.")
+    gauge.set_function(lambda: age)
+
+    assert gauge.samples() == []
+    age = 12.5
+    assert registry.to_prometheus().splitlines()[2:] == ["cache_age_seconds 12.5"]
+
+
+@pytest.mark.parametrize("name", ["metrics.json", "metrics.prom"])
+def test_writer_picks_the_format_from_the_extension(tmp_path: Path, name: str) -> None:
+    registry = MetricsRegistry()
+    registry.counter("sends_total", "Sends.").inc()
+    path = tmp_path / "out" / name
+
+    MetricsWriter(str(path), metrics_registry=registry).write()
+
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        assert json.loads(text)["metrics"]["sends_total"]["samples"][0]["value"] == 1
+    else:
+        assert text == registry.to_prometheus()
+    assert [p.name for p in path.parent.iterdir()] == [name]
+
+
+def test_a_failed_write_leaves_no_temporary_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fail(*_: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    MetricsWriter(str(tmp_path / "metrics.prom"), metrics_registry=MetricsRegistry()).write()
+    assert list(tmp_path.iterdir()) == []
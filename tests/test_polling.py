@@ -0,0 +1,29 @@
+from league_rpc.utils.polling import AdaptivePollScheduler
+
+
+def test_first_tick_keeps_the_initial_interval() -> None:
+    scheduler = AdaptivePollScheduler(initial_interval=5)
+    assert scheduler.observe("a") == 5
+    assert scheduler.ticks == 1
+
+
+def test_changes_halve_the_interval_down_to_the_minimum() -> None:
+    scheduler = AdaptivePollScheduler(min_interval=2, initial_interval=10)
+    scheduler.observe(0)
+    intervals = [scheduler.observe(tick) for tick in range(1, 6)]
+    assert intervals == [5, 2.5, 2, 2, 2]
+
+
+def test_no_change_backs_off_up_to_the_maximum() -> None:
+    scheduler = AdaptivePollScheduler(
+        max_interval=20, initial_interval=5, backoff_factor=2
+    )
+    intervals = [scheduler.observe("same") for _ in range(5)]
+    assert intervals == [5, 10, 20, 20, 20]
+
+
+def test_interval_always_stays_within_bounds() -> None:
+    scheduler = AdaptivePollScheduler(min_interval=2, max_interval=20)
+    signatures = [0, 0, 0, 1, 2, 2, 2, 2, 2, 2, 2, 3, 4, 5, 6, 6]
+    for signature in signatures:
+        assert 2 <= scheduler.observe(signature) <= 20
@@ -0,0 +1,132 @@
+import time
+from typing import Any, Callable
+
+from league_rpc.presence_dispatcher import (
+    HEARTBEAT,
+    PLACEHOLDER,
+    RECLAIM,
+    UPDATE,
+    Activity,
+    PresenceDispatcher,
+)
+from league_rpc.utils.rate_limit import TokenBucket
+
+
+class FakePresence:
+    """Records what would have been sent to Discord."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    def update(self, **activity: Any) -> None:
+        self.sent.append(activity["details"])
+
+    def clear(self) -> None:
+        self.sent.append("clear")
+
+    def close(self) -> None:
+        pass
+
+
+def activity(details: str) -> Callable[[], Activity]:
+    return lambda: {"details": details}
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def unlimited() -> TokenBucket:
+    return TokenBucket(rate=1e9, burst=10**9)
+
+
+def test_due_sends_run_in_priority_order() -> None:
+    dispatcher = PresenceDispatcher(limiter=unlimited())
+    rpc = FakePresence()
+    # Everything is due before the worker starts, so only the priority decides the order.
+    dispatcher.schedule(PLACEHOLDER, activity("placeholder"))
+    dispatcher.schedule(HEARTBEAT, activity("heartbeat"))
+    dispatcher.schedule(RECLAIM, activity("reclaim"))
+    dispatcher.schedule(UPDATE, activity("update"))
+
+    dispatcher.attach(rpc)
+    wait_for(lambda: len(rpc.sent) == 4)
+    dispatcher.close()
+    assert rpc.sent[:4] == ["update", "reclaim", "heartbeat", "placeholder"]
+
+
+def test_schedule_cancels_pending_sends_of_the_given_kinds() -> None:
+    dispatcher = PresenceDispatcher(limiter=unlimited())
+    rpc = FakePresence()
+    dispatcher.schedule(UPDATE, activity("old"))
+    dispatcher.schedule(HEARTBEAT, activity("heartbeat"), delay=0.05)
+    dispatcher.schedule(UPDATE, activity("new"), cancel=(UPDATE, HEARTBEAT))
+
+    dispatcher.attach(rpc)
+    wait_for(lambda: len(rpc.sent) == 1)
+    time.sleep(0.1)
+    dispatcher.close()
+    assert rpc.sent == ["new", "clear"]
+    assert dispatcher.cancelled == 2
+
+
+def test_cancel_drops_the_send_held_back_by_the_limiter() -> None:
+    dispatcher = PresenceDispatcher(limiter=TokenBucket(rate=2, burst=1))
+    rpc = FakePresence()
+    dispatcher.attach(rpc)
+
+    dispatcher.schedule(UPDATE, activity("u1"))
+    wait_for(lambda: rpc.sent == ["u1"])
+    dispatcher.schedule(UPDATE, activity("u2"))
+    wait_for(lambda: dispatcher.throttled == 1)
+
+    dispatcher.schedule(UPDATE, activity("u3"), cancel=(UPDATE,))
+    wait_for(lambda: len(rpc.sent) == 2)
+    time.sleep(0.6)
+    dispatcher.close()
+    assert rpc.sent == ["u1", "u3", "clear"]
+    assert dispatcher.dropped == 1
+
+
+def test_the_latest_held_back_update_wins() -> None:
+    dispatcher = PresenceDispatcher(limiter=TokenBucket(rate=2, burst=1))
+    rpc = FakePresence()
+    dispatcher.attach(rpc)
+
+    dispatcher.schedule(UPDATE, activity("u1"))
+    wait_for(lambda: rpc.sent == ["u1"])
+    dispatcher.schedule(UPDATE, activity("u2"))
+    wait_for(lambda: dispatcher.throttled == 1)
+    # A heartbeat never replaces a held back update, a newer update does.
+    dispatcher.schedule(HEARTBEAT, activity("heartbeat"))
+    wait_for(lambda: dispatcher.throttled == 2)
+    dispatcher.schedule(UPDATE, activity("u3"))
+
+    wait_for(lambda: len(rpc.sent) == 2)
+    time.sleep(0.6)
+    dispatcher.close()
+    assert rpc.sent == ["u1", "u3", "clear"]
+    assert dispatcher.dropped == 2
+
+
+def test_sends_are_skipped_while_discord_is_gone() -> None:
+    dispatcher = PresenceDispatcher(limiter=TokenBucket(rate=2, burst=1))
+    rpc = FakePresence()
+    dispatcher.attach(rpc)
+
+    dispatcher.schedule(UPDATE, activity("u1"))
+    wait_for(lambda: rpc.sent == ["u1"])
+    dispatcher.schedule(UPDATE, activity("u2"))
+    wait_for(lambda: dispatcher.throttled == 1)
+    # The pipe broke while u2 was held back.
+    dispatcher.supervisor.connected = False
+
+    dispatcher.schedule(HEARTBEAT, activity("heartbeat"), delay=0.6)
+    time.sleep(0.8)
+    assert rpc.sent == ["u1"]
+    # Only u2 was lost, the heartbeat would only have repeated it.
+    assert dispatcher.supervisor.lost_sends == 1
+    dispatcher.close()
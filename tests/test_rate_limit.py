@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+
+from league_rpc.utils import rate_limit
+from league_rpc.utils.rate_limit import TokenBucket
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_starts_full_and_allows_a_burst(clock: Clock) -> None:
+    bucket = TokenBucket(rate=1, burst=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert (bucket.granted, bucket.denied) == (3, 1)
+
+
+def test_refills_at_rate_up_to_burst(clock: Clock) -> None:
+    bucket = TokenBucket(rate=2, burst=2)
+    bucket.try_acquire()
+    bucket.try_acquire()
+
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    clock.now += 60
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+def test_delay_until_the_next_token(clock: Clock) -> None:
+    bucket = TokenBucket(rate=4, burst=1)
+    assert bucket.delay() == 0
+    bucket.try_acquire()
+    assert bucket.delay() == pytest.approx(0.25)
+
+    clock.now += 0.1
+    assert bucket.delay() == pytest.approx(0.15)
+
+
+@pytest.mark.parametrize(("rate", "burst"), [(0, 1), (-1, 1), (1, 0)])
+def test_rejects_invalid_settings(rate: float, burst: int) -> None:
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate, burst=burst)
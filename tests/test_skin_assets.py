@@ -0,0 +1,39 @@
+from typing import Optional
+
+import pytest
+
+from league_rpc import champion
+from league_rpc.models.match_memo import MatchMemo
+from league_rpc.skin_tiles import SkinTileCache
+from league_rpc.utils.const import BASE_SKIN_URL
+
+
+@pytest.fixture
+def tiles(monkeypatch: pytest.MonkeyPatch) -> dict[int, Optional[bool]]:
+    """What DDragon answers for each Ahri tile number, None when it can't tell."""
+    answers: dict[int, Optional[bool]] = {}
+    cache = SkinTileCache()
+    monkeypatch.setattr(SkinTileCache, "_version", staticmethod(lambda: None))
+    monkeypatch.setattr(cache, "_head", lambda url: answers[int(url[:-4].rsplit("_", 1)[1])])
+    monkeypatch.setattr(champion, "skin_tile_cache", cache)
+    return answers
+
+
+def test_a_chroma_resolves_to_its_base_skin_tile(tiles: dict[int, Optional[bool]]) -> None:
+    tiles.update({3: False, 2: True})
+    memo = MatchMemo()
+
+    assert champion.get_skin_asset("Ahri", 3, memo) == f"{BASE_SKIN_URL}Ahri_2.jpg"
+    assert memo.skin_assets[("Ahri", 3)] == f"{BASE_SKIN_URL}Ahri_2.jpg"
+
+
+def test_an_inconclusive_check_is_not_remembered(tiles: dict[int, Optional[bool]]) -> None:
+    tiles.update({3: None, 2: True})
+    memo = MatchMemo()
+
+    assert champion.get_skin_asset("Ahri", 3, memo) == f"{BASE_SKIN_URL}Ahri_0.jpg"
+    assert memo.skin_assets == {}
+    assert champion.skin_tile_cache.get_url("Ahri", 3) is None
+
+    tiles[3] = True
+    assert champion.get_skin_asset("Ahri", 3, memo) == f"{BASE_SKIN_URL}Ahri_3.jpg"
@@ -0,0 +1,94 @@
+import random
+from typing import Any, Optional
+
+import pytest
+
+from league_rpc.skin_index import SkinIndex
+
+CHAMPION = "DrMundo"
+
+
+# The linear scans SkinIndex replaced, kept here as the reference behaviour.
+def linear_base_skin_and_chroma(
+    skin_id: int, ddragon: dict[str, Any], chroma_data: Optional[dict[str, Any]]
+) -> tuple[int, Optional[str]]:
+    ddragon_skins = ddragon["data"][CHAMPION]["skins"]
+    if chroma_data is not None:
+        for meraki_skin in chroma_data.get("skins") or []:
+            for chroma in meraki_skin.get("chromas") or []:
+                if chroma is None:
+                    continue
+                if chroma["id"] % 1000 == skin_id:
+                    return meraki_skin["id"] % 1000, chroma["name"]
+
+    for skin in ddragon_skins:
+        if skin["num"] == skin_id:
+            skin_name = skin.get("name", "")
+            if skin_name == "default" or "(" not in skin_name:
+                return skin_id, None
+
+    for skin in sorted(ddragon_skins, key=lambda x: x["num"], reverse=True):
+        if skin["num"] <= skin_id:
+            skin_name = skin.get("name", "")
+            if skin_name == "default" or "(" not in skin_name:
+                return skin["num"], None
+    return 0, None
+
+
+def linear_base_skin_id(skin_id: int, ddragon: dict[str, Any]) -> int:
+    skins = ddragon["data"][CHAMPION]["skins"]
+    for skin in skins:
+        if skin["num"] == skin_id:
+            return skin_id
+    for skin in sorted(skins, key=lambda x: x["num"], reverse=True):
+        if skin["num"] <= skin_id:
+            return skin["num"]
+    return 0
+
+
+def linear_skin_name(skin_id: int, ddragon: dict[str, Any]) -> Optional[str]:
+    for skin in ddragon["data"][CHAMPION]["skins"]:
+        if skin["num"] == skin_id:
+            return None if skin["name"] == "default" else skin["name"]
+    return None
+
+
+def random_champion(
+    rng: random.Random,
+) -> tuple[dict[str, Any], Optional[dict[str, Any]]]:
+    """DDragon and Meraki data with base skins, chromas listed as DDragon skins, and gaps."""
+    ddragon_skins = [{"num": 0, "name": "default"}]
+    meraki_skins = []
+    num = 0
+    for skin in range(rng.randint(0, 8)):
+        num += rng.randint(1, 6)
+        ddragon_skins.append({"num": num, "name": f"Skin {skin}"})
+        chromas = []
+        for color in range(rng.randint(0, 3)):
+            num += 1
+            chromas.append({"id": 36000 + num, "name": f"Skin {skin} (Color {color})"})
+            if rng.random() < 0.5:
+                ddragon_skins.append({"num": num, "name": f"Skin {skin} (Color {color})"})
+        if rng.random() < 0.2:
+            chromas.append(None)
+        meraki_skins.append({"id": 36000 + ddragon_skins[-1]["num"], "chromas": chromas})
+
+    ddragon = {"data": {CHAMPION: {"skins": ddragon_skins}}}
+    chroma_data = None if rng.random() < 0.2 else {"skins": meraki_skins}
+    return ddragon, chroma_data
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_the_linear_lookups(seed: int) -> None:
+    rng = random.Random(seed)
+    ddragon, chroma_data = random_champion(rng)
+    index = SkinIndex.build(CHAMPION, ddragon, chroma_data)
+    ddragon_only = SkinIndex.build(CHAMPION, ddragon, None)
+
+    highest = max(skin["num"] for skin in ddragon["data"][CHAMPION]["skins"])
+    for skin_id in range(highest + 5):
+        assert index.base_skin_and_chroma(skin_id) == linear_base_skin_and_chroma(
+            skin_id, ddragon, chroma_data
+        )
+        assert ddragon_only.base_skin_id(skin_id) == linear_base_skin_id(skin_id, ddragon)
+        assert ddragon_only.display_name(skin_id) == linear_skin_name(skin_id, ddragon)